@@ -0,0 +1,211 @@
+"""Resident memory of BrowserEnv observation retention and rollout buffers.
+
+Each configuration runs in a fresh subprocess and reports growth in
+resident set size. Envs are also measured in a separate run with
+tracemalloc: the allocator does not return every freed snapshot string to
+the OS, so RSS understates savings in retained Python objects. (Buffers are
+mostly tensor storage, which tracemalloc does not see, so they are RSS only.)
+
+- per env: N envs (replaying synthetic snapshots) are stepped and kept
+  alive along with the last state each returned, like a vectorized rollout
+  loop. ``raw`` returns pruned snapshot text and keeps the raw snapshot, as
+  BrowserEnv did before compact observations. ``compact`` returns interned
+  Observations with an 8-deep history ring.
+- per buffer: one env fills a 2048-step buffer. ``snapshots`` stores each
+  step's env state, ``tensor_list`` stores per-step tensors in Python lists
+  (the old RolloutBuffer), ``compact`` uses the preallocated RolloutBuffer
+  with observations released after featurization.
+
+Usage: python -m benchmarks.memory_bench [--size large] [--json out.json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.snapshots import ReplayClient
+from env.browser_env import BrowserEnv
+from env.featurizer import SnapshotFeaturizer
+from env.synthetic_pages import SNAPSHOT_SIZES, snapshot_task
+from training.rollout_buffer import RolloutBuffer
+
+ENV_MODES = ('raw', 'compact')
+BUFFER_MODES = ('snapshots', 'tensor_list', 'compact')
+
+
+def rss_bytes() -> int:
+    """Current resident set size."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        # Peak rather than current RSS, but only used where it only grows
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _Meter:
+    """Growth in RSS, or in tracemalloc-traced Python heap when ``heap``."""
+
+    def __init__(self, heap: bool):
+        self.heap = heap
+
+    def _read(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.heap else rss_bytes()
+
+    def start(self):
+        gc.collect()
+        if self.heap:
+            tracemalloc.start()
+        self.base = self._read()
+
+    def stop(self) -> int:
+        gc.collect()
+        grown = self._read() - self.base
+        if self.heap:
+            tracemalloc.stop()
+        return grown
+
+
+class _ListBuffer:
+    """Per-step Python lists, the layout RolloutBuffer used before preallocation."""
+
+    def __init__(self):
+        self.fields = [[] for _ in range(7)]
+
+    def add(self, *transition):
+        for column, value in zip(self.fields, transition):
+            column.append(value)
+
+
+def _random_action(rng, featurizer, elements):
+    valid = [i for i, ok in enumerate(featurizer.action_mask(elements).tolist()) if ok]
+    return rng.choice(valid) if valid else 0
+
+
+async def _drive(env, featurizer, rng, steps, on_step=None):
+    """Step ``env`` with random valid actions, resetting on episode end."""
+    state = await env.reset()
+    for _ in range(steps):
+        obs, elements = featurizer.featurize(state)
+        index = _random_action(rng, featurizer, elements)
+        if on_step is not None:
+            on_step(state, obs, index, featurizer.action_mask(elements))
+        state, _, done, _ = await env.step(featurizer.decode(index, elements))
+        if done:
+            state = await env.reset()
+    return state
+
+
+def _task(size, compact):
+    # No settle waits and no episode cap noise; history only in compact mode
+    return snapshot_task(size, max_steps=10 ** 9, compact_observations=compact,
+                         history_size=8 if compact else 0)
+
+
+async def measure_envs(mode, size, num_envs, steps, meter):
+    """Bytes retained per env (plus the state its caller holds)."""
+    featurizer = SnapshotFeaturizer()
+    rng = random.Random(0)
+    # Build the shared replay pages outside the measured window
+    clients = [ReplayClient(size, seed=i % 4) for i in range(num_envs)]
+    # Warm up imports, regex caches and torch outside the measured window
+    await _drive(BrowserEnv(_task(size, mode == 'compact'), ReplayClient(size)),
+                 featurizer, rng, steps)
+    meter.start()
+    envs, states = [], []
+    for i in range(num_envs):
+        env = BrowserEnv(_task(size, mode == 'compact'), clients[i])
+        states.append(await _drive(env, featurizer, rng, steps))
+        envs.append(env)
+    return meter.stop() / num_envs
+
+
+async def measure_buffer(mode, size, buffer_steps, meter):
+    """Bytes retained by one filled buffer."""
+    featurizer = SnapshotFeaturizer()
+    rng = random.Random(0)
+    env = BrowserEnv(_task(size, mode == 'compact'), ReplayClient(size))
+    # Warm up the featurizer/policy code paths outside the measured window
+    await _drive(env, featurizer, rng, 8)
+    buffer = RolloutBuffer(buffer_steps) if mode == 'compact' else _ListBuffer()
+
+    def on_step(state, obs, index, mask):
+        stored = state if mode == 'snapshots' else obs
+        buffer.add(stored, index, -0.01, 0.0, 0.0, False, mask)
+
+    meter.start()
+    await _drive(env, featurizer, rng, buffer_steps, on_step)
+    grown = meter.stop()
+    del buffer
+    return grown
+
+
+def _run_worker(args):
+    meter = _Meter(heap=args.worker_metric == 'heap')
+    if args.worker_kind == 'env':
+        grown = asyncio.run(measure_envs(args.worker, args.size, args.envs, args.steps, meter))
+    else:
+        grown = asyncio.run(measure_buffer(args.worker, args.size, args.buffer_steps, meter))
+    print(json.dumps({'bytes': grown}))
+
+
+def _spawn(kind, mode, metric, args):
+    cmd = [sys.executable, os.path.abspath(__file__), '--worker', mode, '--worker-kind', kind,
+           '--worker-metric', metric, '--size', args.size, '--envs', str(args.envs),
+           '--steps', str(args.steps), '--buffer-steps', str(args.buffer_steps)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])['bytes']
+
+
+def run(args):
+    """Results in KB per env (rss and heap) and MB per buffer (rss), keyed by mode."""
+    results = {'size': args.size, 'envs': args.envs, 'buffer_steps': args.buffer_steps,
+               'per_env_kb': {}, 'per_buffer_mb': {}}
+    for metric in ('rss', 'heap'):
+        results['per_env_kb'][metric] = {
+            mode: round(_spawn('env', mode, metric, args) / 1024, 1) for mode in ENV_MODES}
+    results['per_buffer_mb']['rss'] = {
+        mode: round(_spawn('buffer', mode, 'rss', args) / 2 ** 20, 2) for mode in BUFFER_MODES}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', default='large', choices=sorted(SNAPSHOT_SIZES))
+    parser.add_argument('--envs', type=int, default=32)
+    parser.add_argument('--steps', type=int, default=20, help='steps per env')
+    parser.add_argument('--buffer-steps', type=int, default=2048)
+    parser.add_argument('--json', default=None, help='write results to this file')
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--worker-kind', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--worker-metric', default='rss', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        _run_worker(args)
+        return
+
+    results = run(args)
+    print(f"{args.size} snapshots, {args.envs} envs, {args.buffer_steps}-step buffer")
+    print(f"  {'':<12}{'mode':<12}{'rss':>10}{'heap':>10}")
+    for mode in ENV_MODES:
+        rss, heap = (results['per_env_kb'][m][mode] for m in ('rss', 'heap'))
+        print(f"  {'per env':<12}{mode:<12}{rss:>7.1f} KB{heap:>7.1f} KB")
+    for mode in BUFFER_MODES:
+        print(f"  {'per buffer':<12}{mode:<12}{results['per_buffer_mb']['rss'][mode]:>7.2f} MB")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
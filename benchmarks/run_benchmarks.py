@@ -0,0 +1,486 @@
+"""Benchmark suite for the env, MCP client, featurizer, policy and PPO hot paths.
+
+Benchmarks (select with --only):
+
+- mcp: MCPClient.call_tool round trips against the local stub server,
+  sequential and across concurrent sessions
+- env: BrowserEnv.reset/step latency against the stub, broken down by phase
+  from trace spans (action, settle_wait, observe, success_check, prune)
+- featurize: snapshot prune / parse / featurize throughput per snapshot size
+- policy: PolicyNetwork batch inference, float and quantized TorchScript
+- ppo: GAE, RolloutBuffer.get_batch and PPOTrainer.train minibatch throughput
+
+Each benchmark runs ``--rounds`` times and every metric reports the median
+of its rounds. Results are written as JSON (``--output``) and compared
+against a stored baseline (``--baseline``, default benchmarks/baseline.json).
+Changes are slowdown factors: 0.5 means 1.5x slower, whether the metric is
+a throughput or a latency. A gated metric that slowed down by more than its
+tolerance is a regression, and regressions make the run exit non-zero:
+
+- throughputs, MCP call latency and env reset/step latency: ``--tolerance``
+- per-phase env latencies (medians over all steps): ``--phase-tolerance``
+- MCP p95 latency and concurrent MCP throughput: not gated, reported for
+  information (they swing several-fold with thread scheduling)
+
+CPU-bound timings are the best of ``--repeats`` samples, each looping long
+enough to last ``--min-time`` seconds. Round-trip latencies are means or
+percentiles over individual calls.
+
+Baselines are per host; timings from another machine are meaningless. To
+make one, run the full suite on the idle benchmark host with more rounds
+than the default and keep it next to the default baseline:
+
+    python -m benchmarks.run_benchmarks --rounds 5 --update-baseline \
+        --baseline benchmarks/baseline-$(hostname).json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline-$(hostname).json
+
+Regenerate it after a hardware, Python or torch upgrade, or after an
+intended performance change, rather than raising the tolerances.
+
+Usage: python -m benchmarks.run_benchmarks [--quick] [--only mcp,env]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from benchmarks.stub_mcp import StubMCPServer
+from env.browser_env import BrowserEnv
+from env.featurizer import SnapshotFeaturizer, parse_elements
+from env.snapshot_pruning import SnapshotPruner
+from env.synthetic_pages import SNAPSHOT_SIZES, snapshot_task, synthetic_snapshot
+from models.policy import PolicyNetwork
+from training.ppo_trainer import PPOTrainer
+from training.rollout_buffer import RolloutBuffer, compute_gae
+from utils import tracing
+from utils.mcp_client import MCPClient
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Default --tolerance and --phase-tolerance (slowdown factors, see compare())
+TOLERANCE = 0.3
+PHASE_TOLERANCE = 0.2
+ENV_PHASES = ('reset', 'step', 'action', 'settle_wait', 'observe', 'success_check', 'prune',
+              'http_post', 'parse_sse')
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark; it takes the parsed options and returns a Results."""
+    def decorator(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return decorator
+
+
+class Results:
+    """Named metrics with units, the direction that counts as better and the
+    tolerance that gates them (``gate``: 'default', 'phase' or None)."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Dict] = {}
+
+    def add(self, name: str, value: float, unit: str, higher_is_better: bool,
+            gate: Optional[str] = 'default'):
+        self.metrics[name] = {'value': round(value, 4), 'unit': unit,
+                              'higher_is_better': higher_is_better, 'gate': gate}
+
+    def rate(self, name: str, count: float, seconds: float, unit: str,
+             gate: Optional[str] = 'default'):
+        self.add(name, count / seconds, unit, True, gate)
+
+    def latency_ms(self, name: str, seconds: float, gate: Optional[str] = 'default'):
+        self.add(name, seconds * 1000.0, 'ms', False, gate)
+
+
+def time_per_call(fn: Callable, opts) -> float:
+    """Best per-call wall time of ``fn()`` over ``opts.repeats`` samples.
+
+    Like timeit's autorange: each sample calls ``fn`` enough times to last at
+    least ``opts.min_time`` seconds, which keeps timer and scheduler noise
+    small relative to the measurement. The minimum is the least noisy
+    estimate on a shared machine.
+    """
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= opts.min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(opts.min_time / elapsed * 1.2) + 1))
+    best = elapsed / number
+    for _ in range(opts.repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+@benchmark('mcp')
+def bench_mcp(opts) -> Results:
+    results = Results()
+    calls = 50 if opts.quick else 300
+    with StubMCPServer(opts.size, latency_ms=opts.latency_ms) as server:
+        async def run():
+            clients = [await MCPClient.create(server.url)]
+            try:
+                client = clients[0]
+                await client.call_tool('browser_snapshot', {})
+                latencies = []
+                start = time.perf_counter()
+                for _ in range(calls):
+                    t = time.perf_counter()
+                    await client.call_tool('browser_snapshot', {})
+                    latencies.append(time.perf_counter() - t)
+                results.rate('mcp.call_tool.sequential', calls, time.perf_counter() - start,
+                             'calls/s')
+                results.latency_ms('mcp.call_tool.p50', percentile(latencies, 50))
+                results.latency_ms('mcp.call_tool.p95', percentile(latencies, 95), gate=None)
+
+                concurrent = await asyncio.gather(*(MCPClient.create(server.url)
+                                                    for _ in range(opts.sessions)))
+                clients.extend(concurrent)
+                per_client = max(calls // opts.sessions, 1)
+
+                async def drive(c):
+                    for _ in range(per_client):
+                        await c.call_tool('browser_snapshot', {})
+
+                start = time.perf_counter()
+                await asyncio.gather(*(drive(c) for c in concurrent))
+                # Swings 3-4x with thread scheduling on small hosts, so not gated
+                results.rate(f'mcp.call_tool.concurrent{opts.sessions}',
+                             per_client * opts.sessions, time.perf_counter() - start,
+                             'calls/s', gate=None)
+            finally:
+                # Each client owns worker threads
+                await asyncio.gather(*(c.close() for c in clients))
+        asyncio.run(run())
+    return results
+
+
+def _scripted_action(state) -> Dict:
+    """Fill empty textboxes in order, then click Submit."""
+    elements = parse_elements(state)
+    for element in elements:
+        if element['role'] == 'textbox' and not element['value']:
+            return {'type': 'type', 'element_ref': element['ref'], 'text': 'John Doe',
+                    'description': element['name']}
+    submit = next((e for e in elements if e['name'] == 'Submit'), None)
+    if submit is None:
+        return {'type': 'wait', 'time': 0.1}
+    return {'type': 'click', 'element_ref': submit['ref'], 'description': 'Submit'}
+
+
+def _span_durations(events, track: str) -> Dict[str, List[float]]:
+    """Pair begin/end events on ``track`` into per-name durations (seconds)."""
+    durations: Dict[str, List[float]] = {}
+    open_spans: List = []
+    for event in events:
+        if event.get('id') != track:
+            continue
+        if event['ph'] == 'b':
+            open_spans.append(event)
+        elif event['ph'] == 'e' and open_spans:
+            begin = open_spans.pop()
+            durations.setdefault(begin['name'], []).append((event['ts'] - begin['ts']) / 1e6)
+    return durations
+
+
+@benchmark('env')
+def bench_env(opts) -> Results:
+    results = Results()
+    steps = 60 if opts.quick else 400
+    with StubMCPServer(opts.size, latency_ms=opts.latency_ms) as server:
+        async def run():
+            client = await MCPClient.create(server.url)
+            env = BrowserEnv(snapshot_task(opts.size, reset_timeout=5.0), client)
+            state = await env.reset()
+            tracing.enable()
+            tracing.get_tracer().clear()
+            try:
+                state = await env.reset()
+                for _ in range(steps):
+                    state, _, done, _ = await env.step(_scripted_action(state))
+                    if done:
+                        state = await env.reset()
+                return _span_durations(tracing.get_tracer().events, env.trace_track)
+            finally:
+                tracing.disable()
+                tracing.get_tracer().clear()
+                await client.close()
+        durations = asyncio.run(run())
+    for phase in ('reset', 'step'):
+        if phase in durations:
+            results.latency_ms(f'env.{phase}.mean', statistics.fmean(durations[phase]))
+    # Medians: one slow step (GC, scheduler) moves a mean but not a median
+    for phase in ENV_PHASES:
+        if phase in durations:
+            results.latency_ms(f'env.{phase}.p50', statistics.median(durations[phase]),
+                               gate='phase')
+    if 'step' in durations:
+        results.latency_ms('env.step.p95', percentile(durations['step'], 95))
+    return results
+
+
+@benchmark('featurize')
+def bench_featurize(opts) -> Results:
+    results = Results()
+    count = 20
+    featurizer = SnapshotFeaturizer()
+    for size in SNAPSHOT_SIZES:
+        pruner = SnapshotPruner(snapshot_task(size))
+        snapshots = [synthetic_snapshot(size, seed=i, filled=i % 3) for i in range(count)]
+        pruned = [pruner.prune(s)[0] for s in snapshots]
+        megabytes = sum(len(s) for s in snapshots) / 2 ** 20
+
+        def prune_all():
+            for s in snapshots:
+                pruner.prune(s)
+
+        def parse_all():
+            for s in snapshots:
+                parse_elements(s)
+
+        def featurize_all():
+            for p in pruned:
+                featurizer.featurize(p)
+
+        seconds = time_per_call(prune_all, opts)
+        results.rate(f'featurize.{size}.prune', count, seconds, 'snapshots/s')
+        results.rate(f'featurize.{size}.prune_mb', megabytes, seconds, 'MB/s')
+        results.rate(f'featurize.{size}.parse_raw', count, time_per_call(parse_all, opts),
+                     'snapshots/s')
+        results.rate(f'featurize.{size}.featurize_pruned', count,
+                     time_per_call(featurize_all, opts), 'snapshots/s')
+    return results
+
+
+@benchmark('policy')
+def bench_policy(opts) -> Results:
+    results = Results()
+    featurizer = SnapshotFeaturizer()
+    torch.manual_seed(0)
+    policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim,
+                           hidden_dim=featurizer.obs_dim).eval()
+    for batch in (1, 32, 256):
+        obs = torch.randn(batch, featurizer.obs_dim)
+        mask = torch.ones(batch, featurizer.action_dim, dtype=torch.bool)
+        results.rate(f'policy.act.batch{batch}', batch,
+                     time_per_call(lambda: policy.act(obs, mask=mask), opts), 'samples/s')
+    try:
+        from models.inference import InferencePolicy
+        inference = InferencePolicy(policy, torch.zeros(1, featurizer.obs_dim))
+    except Exception as e:  # quantized backends are platform-dependent
+        print(f"  skipping quantized policy: {e}")
+        return results
+    obs = torch.randn(1, featurizer.obs_dim)
+    results.rate('policy.act_quantized.batch1', 1,
+                 time_per_call(lambda: inference.act(obs), opts), 'samples/s')
+    return results
+
+
+@benchmark('ppo')
+def bench_ppo(opts) -> Results:
+    results = Results()
+    steps = 2048
+    featurizer = SnapshotFeaturizer()
+    generator = torch.Generator().manual_seed(0)
+    rewards = (torch.rand(steps, generator=generator) - 0.9).tolist()
+    values = torch.randn(steps, generator=generator).tolist()
+    dones = [(t + 1) % 20 == 0 for t in range(steps)]
+    results.rate('ppo.gae', steps,
+                 time_per_call(lambda: compute_gae(rewards, values, dones), opts), 'steps/s')
+
+    buffer = RolloutBuffer(steps)
+    obs = torch.randn(steps, featurizer.obs_dim, generator=generator)
+    mask = torch.ones(featurizer.action_dim, dtype=torch.bool)
+    for t in range(steps):
+        buffer.add(obs[t], t % featurizer.action_dim, rewards[t], values[t], -3.0, dones[t], mask)
+    results.rate('ppo.get_batch', steps, time_per_call(buffer.get_batch, opts), 'steps/s')
+
+    torch.manual_seed(0)
+    policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim,
+                           hidden_dim=featurizer.obs_dim)
+    config = {'num_epochs': 1 if opts.quick else 4, 'batch_size': 64, 'learning_rate': 3e-4}
+    trainer = PPOTrainer(policy, config)
+    batch = buffer.get_batch()
+    results.rate('ppo.train', steps * config['num_epochs'],
+                 time_per_call(lambda: trainer.train(batch), opts), 'samples/s')
+    return results
+
+
+def median_metrics(rounds: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Merge per-round metrics into one entry per metric holding the median value.
+
+    The per-round values are kept under 'samples' when there is more than one.
+    """
+    merged = {}
+    for name, metric in rounds[0].items():
+        values = [r[name]['value'] for r in rounds if name in r]
+        merged[name] = dict(metric, value=round(statistics.median(values), 4))
+        if len(values) > 1:
+            merged[name]['samples'] = values
+    return merged
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info(opts) -> Dict:
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'torch_threads': torch.get_num_threads(),
+        'snapshot_size': opts.size,
+        'latency_ms': opts.latency_ms,
+        'quick': opts.quick,
+        'min_time': opts.min_time,
+        'rounds': opts.rounds,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerances: Dict[str, float]) -> List[Dict]:
+    """Per-metric change vs baseline.
+
+    ``slowdown`` is how much longer the work took relative to the baseline
+    (0.5 = 1.5x slower) for throughputs and latencies alike. A gated metric
+    is a 'regression' when its slowdown exceeds ``tolerances[gate]`` and
+    'improved' when it sped up by as much; ungated metrics are 'info'.
+    """
+    rows = []
+    for name, metric in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None or not base['value']:
+            rows.append({'name': name, 'value': metric['value'], 'unit': metric['unit'],
+                         'baseline': None, 'change': None, 'slowdown': None,
+                         'status': 'new'})
+            continue
+        ratio = metric['value'] / base['value']
+        change = ratio - 1.0
+        slowdown = (1.0 / ratio if metric['higher_is_better'] else ratio) - 1.0
+        gate = metric.get('gate')
+        if gate is None:
+            status = 'info'
+        elif slowdown > tolerances[gate]:
+            status = 'regression'
+        elif (1.0 + slowdown) * (1.0 + tolerances[gate]) < 1.0:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'name': name, 'value': metric['value'], 'unit': metric['unit'],
+                     'baseline': base['value'], 'change': change, 'slowdown': slowdown,
+                     'status': status})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', default=None,
+                        help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--quick', action='store_true', help='fewer iterations (smoke test)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=None,
+                        help='runs of each benchmark, reported as the median '
+                             '(default 3, 1 with --quick)')
+    parser.add_argument('--min-time', type=float, default=None,
+                        help='seconds per timing sample (default 0.2, 0.05 with --quick)')
+    parser.add_argument('--size', default='medium', choices=sorted(SNAPSHOT_SIZES),
+                        help='snapshot size served by the stub for mcp/env')
+    parser.add_argument('--latency-ms', type=float, default=0.0,
+                        help='stub server latency per request')
+    parser.add_argument('--sessions', type=int, default=8,
+                        help='concurrent MCP sessions for the concurrent call benchmark')
+    parser.add_argument('--threads', type=int, default=1, help='torch intra-op threads')
+    parser.add_argument('--output', default=None, help='write results JSON here')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='slowdown tolerated for throughputs and whole-call latencies '
+                             '(0.3 = 1.3x slower)')
+    parser.add_argument('--phase-tolerance', type=float, default=PHASE_TOLERANCE,
+                        help='slowdown tolerated for per-phase env latency medians')
+    parser.add_argument('--update-baseline', action='store_true')
+    opts = parser.parse_args()
+    if opts.min_time is None:
+        opts.min_time = 0.05 if opts.quick else 0.2
+    if opts.rounds is None:
+        opts.rounds = 1 if opts.quick else 3
+    torch.set_num_threads(opts.threads)
+
+    names = opts.only.split(',') if opts.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    report = {'meta': machine_info(opts), 'results': {}}
+    for name in names:
+        print(f"Running {name}...", flush=True)
+        rounds = [BENCHMARKS[name](opts).metrics for _ in range(opts.rounds)]
+        report['results'].update(median_metrics(rounds))
+
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if opts.update_baseline:
+        with open(opts.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {opts.baseline}")
+
+    baseline = {}
+    if os.path.exists(opts.baseline) and not opts.update_baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+        for key in ('machine', 'cpu_count', 'torch_threads', 'snapshot_size', 'latency_ms',
+                    'quick'):
+            if baseline.get('meta', {}).get(key) != report['meta'][key]:
+                print(f"warning: baseline {key}={baseline['meta'].get(key)!r} differs from "
+                      f"this run ({report['meta'][key]!r})")
+    tolerances = {'default': opts.tolerance, 'phase': opts.phase_tolerance}
+    rows = compare(report, baseline, tolerances)
+    print(f"\n{'metric':<42}{'value':>14}  {'unit':<12}{'baseline':>14}{'change':>9}  status")
+    for row in rows:
+        base = f"{row['baseline']:.4g}" if row['baseline'] is not None else '-'
+        change = f"{row['change']:+.1%}" if row['change'] is not None else '-'
+        print(f"{row['name']:<42}{row['value']:>14.4g}  {row['unit']:<12}{base:>14}{change:>9}"
+              f"  {row['status']}")
+    regressions = [f"{row['name']} ({row['slowdown']:+.0%})" for row in rows
+                   if row['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Replay of synthetic snapshots (env/synthetic_pages.py) for benchmarks.
+
+ReplaySession is the page state machine behind benchmarks/stub_mcp.py;
+ReplayClient runs it in-process without HTTP.
+"""
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from env.synthetic_pages import form_fields, synthetic_snapshot
+
+
+@lru_cache(maxsize=None)
+def _encoded_pages(size: str, seed: int) -> Tuple[Tuple[bytes, ...], bytes]:
+    fields = len(form_fields(size))
+    pages = tuple(synthetic_snapshot(size, seed, filled).encode('utf-8')
+                  for filled in range(fields + 1))
+    return pages, synthetic_snapshot(size, seed, fields, submitted=True).encode('utf-8')
+
+
+class ReplaySession:
+    """Page state machine replaying synthetic snapshots for one browser session.
+
+    Typing fills the next field and clicking Submit after all fields are
+    filled shows the success message. Every snapshot is decoded from bytes,
+    the way a real HTTP response is, so callers get a fresh string per call.
+    Encoded pages are cached and shared by all sessions with the same size
+    and seed.
+    """
+
+    def __init__(self, size: str = 'medium', seed: int = 0):
+        self.size = size
+        self._pages, self._success = _encoded_pages(size, seed)
+        self.filled = 0
+        self.submitted = False
+        self.calls = 0
+
+    def handle(self, tool_name: str, params: Dict) -> str:
+        """Apply one tool call; returns the tool's text result."""
+        self.calls += 1
+        if tool_name == 'browser_navigate':
+            self.filled = 0
+            self.submitted = False
+        elif tool_name == 'browser_type':
+            self.filled = min(self.filled + 1, len(self._pages) - 1)
+        elif tool_name == 'browser_click':
+            self.submitted = self.filled == len(self._pages) - 1
+        elif tool_name == 'browser_snapshot':
+            page = self._success if self.submitted else self._pages[self.filled]
+            return page.decode('utf-8')
+        return 'ok'
+
+
+class ReplayClient(ReplaySession):
+    """In-process stand-in for MCPClient (no HTTP, no latency)."""
+
+    async def call_tool(self, tool_name: str, params: Dict) -> str:
+        return self.handle(tool_name, params)
+
+    async def close(self):
+        pass
@@ -0,0 +1,171 @@
+"""Local stub of the Playwright MCP HTTP server for benchmarks.
+
+Speaks the same streamable-HTTP JSON-RPC dialect that MCPClient expects:
+``initialize`` hands out an ``Mcp-Session-Id``, and replies are single SSE
+``message`` events. Each session replays synthetic snapshots of a chosen
+size (see env/synthetic_pages.py) behind a configurable per-request
+latency, so client, env and rollout code can be measured without a browser.
+
+Standalone: python -m benchmarks.stub_mcp --port 8931 --size large --latency-ms 20
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from benchmarks.snapshots import ReplaySession
+from env.synthetic_pages import SNAPSHOT_SIZES
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: '_Server'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, message: Optional[Dict] = None,
+               session_id: Optional[str] = None):
+        body = b''
+        if message is not None:
+            body = f"event: message\ndata: {json.dumps(message)}\n\n".encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Content-Length', str(len(body)))
+        if session_id:
+            self.send_header('Mcp-Session-Id', session_id)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        stub.delay()
+        method = request.get('method')
+        if 'id' not in request:
+            # Notification (e.g. "initialized")
+            self._reply(202)
+            return
+        if method == 'initialize':
+            session_id = stub.open_session()
+            self._reply(200, {'jsonrpc': '2.0', 'id': request['id'], 'result': {
+                'protocolVersion': '2024-11-05', 'capabilities': {'tools': {}},
+                'serverInfo': {'name': 'stub-mcp', 'version': '0.1.0'}}}, session_id)
+            return
+        session = stub.sessions.get(self.headers.get('Mcp-Session-Id'))
+        if session is None:
+            self._reply(404, {'jsonrpc': '2.0', 'id': request['id'],
+                              'error': {'code': -32001, 'message': 'Session not found'}})
+            return
+        if method != 'tools/call':
+            self._reply(200, {'jsonrpc': '2.0', 'id': request['id'],
+                              'error': {'code': -32601, 'message': f'Unknown method {method}'}})
+            return
+        params = request.get('params', {})
+        arguments = params.get('arguments', {})
+        if params.get('name') == 'browser_wait_for' and stub.honor_waits:
+            time.sleep(float(arguments.get('time', 0) or 0))
+        with stub.lock:
+            text = session.handle(params.get('name'), arguments)
+        self._reply(200, {'jsonrpc': '2.0', 'id': request['id'],
+                          'result': {'content': [{'type': 'text', 'text': text}]}})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class StubMCPServer:
+    """Threaded stub MCP server; use as a context manager or start()/stop()."""
+
+    def __init__(self, size: str = 'medium', latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 honor_waits: bool = False, host: str = '127.0.0.1', port: int = 0,
+                 seed: int = 0):
+        """
+        Args:
+            size: snapshot preset (key of SNAPSHOT_SIZES)
+            latency_ms: added to every request
+            jitter_ms: uniform random extra latency in [0, jitter_ms]
+            honor_waits: sleep for browser_wait_for's ``time`` (off by default
+                so benchmarks measure overhead, not fixed settle delays)
+            host, port: bind address (port 0 picks a free port)
+            seed: snapshot content seed
+        """
+        self.size = size
+        self.latency_s = latency_ms / 1000.0
+        self.jitter_s = jitter_ms / 1000.0
+        self.honor_waits = honor_waits
+        self.seed = seed
+        self.sessions: Dict[str, ReplaySession] = {}
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._rng = random.Random(seed)
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/mcp"
+
+    def delay(self):
+        if self.latency_s or self.jitter_s:
+            with self.lock:
+                jitter = self._rng.uniform(0, self.jitter_s)
+            time.sleep(self.latency_s + jitter)
+
+    def open_session(self) -> str:
+        with self.lock:
+            session_id = f"stub-{next(self._ids)}"
+            self.sessions[session_id] = ReplaySession(self.size, self.seed)
+        return session_id
+
+    def start(self) -> 'StubMCPServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread (standalone use)."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8931)
+    parser.add_argument('--size', default='medium', choices=sorted(SNAPSHOT_SIZES))
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--honor-waits', action='store_true')
+    args = parser.parse_args()
+    server = StubMCPServer(args.size, args.latency_ms, args.jitter_ms, args.honor_waits,
+                           args.host, args.port)
+    print(f"Stub MCP server on {server.url} ({args.size} snapshots)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
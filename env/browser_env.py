@@ -1,7 +1,33 @@
 """Minimal browser environment wrapper for Playwright MCP."""
 
 import json
-from typing import Dict, Any, Tuple, Optional
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, Tuple, Optional, Union
+
+from env.featurizer import parse_elements
+from env.observation import Observation, SymbolTable
+from env.snapshot_pruning import SnapshotPruner, validation_messages
+from utils import tracing
+from utils.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Longest MCP payload excerpt written to debug logs
+LOG_PREVIEW_CHARS = 500
+
+
+def _preview(value: Any) -> str:
+    text = str(value)
+    if len(text) <= LOG_PREVIEW_CHARS:
+        return text
+    return f"{text[:LOG_PREVIEW_CHARS]}... ({len(text)} chars)"
+
+
+# What reset()/step() return: an Observation in compact mode, otherwise the
+# (pruned) snapshot as returned by browser_snapshot
+State = Union[Observation, str, Dict[str, Any]]
 
 
 class BrowserEnv:
@@ -18,28 +44,63 @@ class BrowserEnv:
                 - submit_selector: CSS selector for submit button (optional)
                 - success_condition: text/selector to check for success
                 - max_steps: maximum steps per episode
+                - reset_timeout: seconds reset() may spend waiting for a
+                  non-empty snapshot (default 15)
+                - prune_snapshots: prune observations to the task-relevant
+                  form subtree (default True)
+                - max_elements: element cap for pruning (default 64)
+                - compact_observations: return interned Observation objects
+                  and drop raw snapshots once observed (default True);
+                  False returns the pruned snapshot itself
+                - history_size: observations kept in ``self.history``
+                  (default 8)
             mcp_client: MCP client instance with browser tools
         """
         self.task_config = task_config
         self.mcp_client = mcp_client
         self.current_step = 0
         self.max_steps = task_config.get('max_steps', 50)
+        self.reset_timeout = task_config.get('reset_timeout', 15.0)
+        self.pruner = None
+        if task_config.get('prune_snapshots', True):
+            self.pruner = SnapshotPruner(task_config, task_config.get('max_elements', 64))
+        self.last_pruning = None
+        self.compact = task_config.get('compact_observations', True)
         self.current_url = None
+        # Raw snapshot of the current page; only retained until it has been
+        # observed when compact_observations is on
         self.last_snapshot = None
+        self.last_observation = None
+        # Strings of this episode's observations; replaced on reset so the
+        # table never outlives the observations that use it
+        self.symbols = SymbolTable()
+        self.history = deque(maxlen=task_config.get('history_size', 8))
+        # Async trace track so concurrent envs render as separate timelines
+        self.trace_track = tracing.new_track('env')
     
     async def _call_mcp_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
-        """Call MCP tool and return result."""
+        """Call MCP tool and return result.
+        
+        Tool errors are logged and yield None. CircuitOpenError propagates so
+        the rollout driver can take this env's session out of rotation.
+        """
         if not self.mcp_client:
             return None
+        # Payload formatting is only paid for when DEBUG logging is on; a full
+        # snapshot can be hundreds of KB.
+        debug = logger.isEnabledFor(logging.DEBUG)
         try:
-            print(f"Calling MCP tool {tool_name} with params: {params}")
-            result = await self.mcp_client.call_tool(tool_name, params)
-            print(f"MCP tool {tool_name} returned: {result}")
+            if debug:
+                logger.debug("Calling MCP tool %s with params: %s", tool_name, _preview(params))
+            with tracing.span(tool_name, 'mcp'):
+                result = await self.mcp_client.call_tool(tool_name, params)
+            if debug:
+                logger.debug("MCP tool %s returned: %s", tool_name, _preview(result))
             return result
+        except CircuitOpenError:
+            raise
         except Exception as e:
-            print(f"Error calling MCP tool {tool_name}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.warning("Error calling MCP tool %s: %s", tool_name, e, exc_info=debug)
             return None
     
     async def _navigate(self, url: str):
@@ -80,9 +141,39 @@ class BrowserEnv:
             params['time'] = time
         return await self._call_mcp_tool('browser_wait_for', params)
     
-    async def _check_success(self) -> bool:
-        """Check if task is completed successfully."""
-        snapshot = await self._get_snapshot()
+    def _observe(self, snapshot: Any) -> State:
+        """Prune a raw snapshot into the observation handed to the policy.
+        
+        In compact mode the result is an Observation of the actionable
+        elements plus validation messages as ``alert`` entries; the raw
+        snapshot is released and an empty (failed) snapshot repeats the last
+        observation.
+        """
+        if self.compact and not snapshot and self.last_observation is not None:
+            return self.last_observation
+        observation = snapshot
+        if self.pruner is not None:
+            with tracing.span('prune', 'env'):
+                observation, self.last_pruning = self.pruner.prune(snapshot)
+        if self.compact:
+            entries = parse_elements(observation)
+            entries.extend({'ref': '', 'role': 'alert', 'name': message, 'value': ''}
+                           for message in validation_messages(observation))
+            observation = Observation(entries, self.current_url, self.current_step,
+                                      self.symbols)
+            self.last_observation = observation
+            self.last_snapshot = None
+        self.history.append(observation)
+        return observation
+    
+    async def _check_success(self, snapshot: Any = None) -> bool:
+        """Check if task is completed successfully.
+        
+        Args:
+            snapshot: raw (unpruned) snapshot to check; fetched if None
+        """
+        if snapshot is None:
+            snapshot = await self._get_snapshot()
         success_condition = self.task_config.get('success_condition')
         if not success_condition:
             return False
@@ -93,29 +184,36 @@ class BrowserEnv:
             return success_condition.lower() in snapshot_str.lower()
         return False
     
-    async def reset(self) -> Dict[str, Any]:
+    async def reset(self) -> State:
         """Reset environment and return initial state."""
-        self.current_step = 0
-        url = self.task_config['url']
-        await self._navigate(url)
-        # Wait and try to get a non-empty state dict; retry if empty.
-        # Use exponential backoff for waiting, up to a max wait of 60 seconds total
-        backoff = 0.5
-        max_wait = 60.0
+        with tracing.span('reset', 'env', track=self.trace_track):
+            self.current_step = 0
+            self.last_snapshot = None
+            self.last_observation = None
+            self.symbols = SymbolTable()
+            self.history.clear()
+            url = self.task_config['url']
+            await self._navigate(url)
+            # Wait and try to get a non-empty state; retry with exponential
+            # backoff, bounded by reset_timeout so a wedged tab fails fast.
+            deadline = time.monotonic() + self.reset_timeout
+            backoff = 0.5
 
-        await self._wait_for(time=backoff)
-
-        state = await self._get_snapshot()
-        while (not state or not isinstance(state, dict) or not state) and backoff < max_wait:
-            print(f"line 102: State: {state}")
-            backoff = min(backoff * 2, max_wait)
-            if backoff <= 0:
-                break
             await self._wait_for(time=backoff)
+
             state = await self._get_snapshot()
-        return state
+            while not state:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("No snapshot from %s within %.1fs", url, self.reset_timeout)
+                    break
+                backoff = min(backoff * 2, remaining)
+                logger.debug("Empty snapshot after reset, retrying in %.1fs", backoff)
+                await self._wait_for(time=backoff)
+                state = await self._get_snapshot()
+            return self._observe(state)
     
-    async def step(self, action: Dict[str, Any]) -> Tuple[Dict[str, Any], float, bool, Dict[str, Any]]:
+    async def step(self, action: Dict[str, Any]) -> Tuple[State, float, bool, Dict[str, Any]]:
         """
         Execute action and return (state, reward, done, info).
         
@@ -127,44 +225,55 @@ class BrowserEnv:
                 - description: human-readable element description
         
         Returns:
-            state: accessibility snapshot
+            state: Observation of the pruned snapshot, validation messages
+                included as alert entries; the pruned snapshot itself when
+                compact_observations is off
             reward: float reward
             done: bool whether episode is done
             info: dict with additional info
         """
-        self.current_step += 1
+        with tracing.span('step', 'env', track=self.trace_track):
+            self.current_step += 1
         
-        # Execute action
-        action_type = action.get('type')
-        element_ref = action.get('element_ref', '')
-        text = action.get('text', '')
-        description = action.get('description', '')
+            # Execute action
+            action_type = action.get('type')
+            element_ref = action.get('element_ref', '')
+            text = action.get('text', '')
+            description = action.get('description', '')
         
-        if action_type == 'click':
-            await self._click(element_ref, description)
-        elif action_type == 'type':
-            await self._type(element_ref, text, description)
-        elif action_type == 'submit':
-            await self._click(element_ref, description or 'submit button')
-        elif action_type == 'wait':
-            await self._wait_for(time=action.get('time', 0.5))
+            with tracing.span('action', 'env'):
+                if action_type == 'click':
+                    await self._click(element_ref, description)
+                elif action_type == 'type':
+                    await self._type(element_ref, text, description)
+                elif action_type == 'submit':
+                    await self._click(element_ref, description or 'submit button')
+                elif action_type == 'wait':
+                    await self._wait_for(time=action.get('time', 0.5))
         
-        await self._wait_for(time=0.3)
-        state = await self._get_snapshot()
+            with tracing.span('settle_wait', 'env'):
+                await self._wait_for(time=0.3)
+            with tracing.span('observe', 'env'):
+                snapshot = await self._get_snapshot()
         
-        done = False
-        reward = -0.01
-        success = await self._check_success()
+            done = False
+            reward = -0.01
+            with tracing.span('success_check', 'env'):
+                success = await self._check_success(snapshot)
+            state = self._observe(snapshot)
         
-        if success:
-            reward = 1.0
-            done = True
-        elif self.current_step >= self.max_steps:
-            reward = -1.0
-            done = True
+            if success:
+                reward = 1.0
+                done = True
+            elif self.current_step >= self.max_steps:
+                reward = -1.0
+                done = True
         
-        info = {'step': self.current_step, 'success': success if done else False, 'action_type': action_type}
-        return state, reward, done, info
+            info = {'step': self.current_step, 'success': success if done else False, 'action_type': action_type}
+            if self.pruner is not None:
+                info['pruning_ratio'] = self.last_pruning['ratio']
+                info['kept_elements'] = self.last_pruning['kept_elements']
+            return state, reward, done, info
     
     async def render(self) -> Dict[str, Any]:
         """Get current state snapshot."""
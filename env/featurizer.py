@@ -0,0 +1,117 @@
+"""Snapshot featurization and action decoding for the policy.
+
+Observations are encoded with a fixed number of element slots. Each slot
+holds hashed role and name-token features of one interactable element, so
+the policy's discrete action space is ``(action type, slot)``.
+"""
+
+import re
+import zlib
+from typing import Dict, Any, List, Optional, Tuple
+
+import torch
+
+from env.observation import Observation
+
+ACTION_TYPES = ('click', 'type', 'submit')
+
+# Container roles that carry refs in MCP snapshots but are never acted on
+STRUCTURAL_ROLES = frozenset({
+    'generic', 'main', 'form', 'group', 'region', 'banner', 'navigation',
+    'contentinfo', 'complementary', 'list', 'listitem', 'dialog', 'document',
+    'article', 'section', 'img', 'separator',
+})
+
+_LINE_RE = re.compile(r'^\s*- ([A-Za-z][\w-]*)(?: "((?:[^"\\]|\\.)*)")?.*?\[ref=([^\]]+)\](.*)$')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _bucket(text: str, size: int) -> int:
+    """Stable hash bucket (python's hash() is randomized per process)."""
+    return zlib.crc32(text.encode('utf-8')) % size
+
+
+def parse_elements(snapshot: Any) -> List[Dict[str, str]]:
+    """Extract non-structural ref-bearing elements as dicts with ref, role, name and value."""
+    if isinstance(snapshot, Observation):
+        # Ref-less entries are validation messages, not elements
+        return [e for e in snapshot.elements() if e['ref']]
+    if isinstance(snapshot, dict):
+        elements = [{'ref': str(e.get('ref', '')),
+                     'role': str(e.get('type') or e.get('role') or ''),
+                     'name': str(e.get('name', '')),
+                     'value': str(e.get('value', '') or ('checked' if e.get('checked') else ''))}
+                    for e in snapshot.get('elements', []) if e.get('ref')]
+        return [e for e in elements if e['role'] not in STRUCTURAL_ROLES]
+    if not isinstance(snapshot, str):
+        return []
+    elements = []
+    for line in snapshot.split('\n'):
+        match = _LINE_RE.match(line)
+        if match:
+            role, name, ref, rest = match.groups()
+            if role.lower() in STRUCTURAL_ROLES:
+                continue
+            value = rest.rsplit(':', 1)[1].strip() if ':' in rest and not rest.endswith(':') else ''
+            elements.append({'ref': ref, 'role': role.lower(), 'name': name or '', 'value': value})
+    return elements
+
+
+class SnapshotFeaturizer:
+    """Maps snapshots to fixed-size tensors and action indices to env actions."""
+
+    def __init__(self, obs_dim: int = 256, max_elements: int = 16,
+                 text_values: Optional[Dict[str, str]] = None, default_text: str = 'John Doe'):
+        """
+        Args:
+            obs_dim: observation size; split evenly into max_elements slots
+            max_elements: element slots (first N elements in document order)
+            text_values: label -> text to type, matched case-insensitively
+                against the element name
+            default_text: text typed into elements without a text_values match
+        """
+        if obs_dim % max_elements:
+            raise ValueError("obs_dim must be a multiple of max_elements")
+        self.obs_dim = obs_dim
+        self.max_elements = max_elements
+        self.slot_dim = obs_dim // max_elements
+        self.action_dim = len(ACTION_TYPES) * max_elements
+        self.text_values = {k.lower(): v for k, v in (text_values or {}).items()}
+        self.default_text = default_text
+
+    def featurize(self, snapshot: Any) -> Tuple[torch.Tensor, List[Dict[str, str]]]:
+        """Return (obs tensor of shape [obs_dim], elements occupying the slots)."""
+        elements = parse_elements(snapshot)[:self.max_elements]
+        # Fill a python list and convert once; per-item tensor writes are slow
+        values = [0.0] * self.obs_dim
+        # Reserve the first two features of each slot for presence and filled flags
+        hashed = self.slot_dim - 2
+        for slot, element in enumerate(elements):
+            base = slot * self.slot_dim
+            values[base] = 1.0
+            values[base + 1] = 1.0 if element['value'] else 0.0
+            values[base + 2 + _bucket('role:' + element['role'], hashed)] += 1.0
+            for token in _TOKEN_RE.findall(element['name'].lower()):
+                values[base + 2 + _bucket('tok:' + token, hashed)] += 0.5
+        return torch.tensor(values), elements
+
+    def action_mask(self, elements: List[Dict[str, str]]) -> torch.Tensor:
+        """Boolean mask of actions that refer to an occupied slot."""
+        occupied = torch.zeros(self.max_elements, dtype=torch.bool)
+        occupied[:len(elements)] = True
+        return occupied.repeat(len(ACTION_TYPES))
+
+    def decode(self, index: int, elements: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Map a discrete action index back to a BrowserEnv action dict."""
+        action_type = ACTION_TYPES[index // self.max_elements]
+        slot = index % self.max_elements
+        if slot >= len(elements):
+            return {'type': 'wait', 'time': 0.1}
+        element = elements[slot]
+        action = {'type': action_type, 'element_ref': element['ref'],
+                  'description': f"{element['name']} {element['role']}".strip()}
+        if action_type == 'type':
+            name = element['name'].lower()
+            action['text'] = next((v for k, v in self.text_values.items() if k in name),
+                                  self.default_text)
+        return action
@@ -0,0 +1,113 @@
+"""Compact observations built from pruned snapshots.
+
+Rollouts produce thousands of snapshots that repeat the same few hundred
+strings: roles, labels, refs like ``e89`` and typed values. An Observation
+keeps only the actionable elements plus validation messages (entries with
+role ``alert`` and no ref). Each entry is stored as four symbol ids in an
+``array('I')``, and the strings live once in the episode's SymbolTable.
+Lookups hand back the table's canonical string objects, so every
+observation of an episode shares one copy, and the table is freed with the
+episode's last observation.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+ELEMENT_FIELDS = ('ref', 'role', 'name', 'value')
+
+
+class SymbolTable:
+    """Bidirectional string <-> int id table; each distinct string is stored once."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def id(self, text: str) -> int:
+        """Id of ``text``, adding it on first sight."""
+        symbol = self._ids.get(text)
+        if symbol is None:
+            symbol = len(self._strings)
+            self._ids[text] = symbol
+            self._strings.append(text)
+        return symbol
+
+    def intern(self, text: str) -> str:
+        """Canonical copy of ``text``."""
+        return self._strings[self.id(text)]
+
+    def __getitem__(self, symbol: int) -> str:
+        return self._strings[symbol]
+
+
+class Observation:
+    """Immutable element list of one snapshot, stored as interned symbol ids.
+
+    Validation messages are entries with role ``alert`` and an empty ref;
+    ``elements()`` returns them and parse_elements() skips them.
+    """
+
+    __slots__ = ('_ids', 'url', 'step', 'symbols')
+
+    def __init__(self, elements: Iterable[Dict[str, str]], url: Optional[str] = None,
+                 step: int = 0, symbols: Optional[SymbolTable] = None):
+        """
+        Args:
+            elements: dicts with ref, role, name and value (see
+                env.featurizer.parse_elements)
+            url: page URL the snapshot was taken on
+            step: env step the snapshot was taken after (0 = reset)
+            symbols: symbol table the strings are interned into (a new one
+                if None); BrowserEnv uses one per episode
+        """
+        if symbols is None:
+            symbols = SymbolTable()
+        ids = array('I')
+        for element in elements:
+            ids.extend(symbols.id(element.get(field, '')) for field in ELEMENT_FIELDS)
+        self._ids = ids
+        self.url = url
+        self.step = step
+        self.symbols = symbols
+
+    def __len__(self) -> int:
+        return len(self._ids) // len(ELEMENT_FIELDS)
+
+    def __bool__(self) -> bool:
+        # An observation of an empty page is still an observation
+        return True
+
+    def elements(self) -> List[Dict[str, str]]:
+        """Entry dicts (ref, role, name, value): elements in document order, then messages."""
+        n = len(ELEMENT_FIELDS)
+        strings = self.symbols
+        return [{field: strings[self._ids[i + k]] for k, field in enumerate(ELEMENT_FIELDS)}
+                for i in range(0, len(self._ids), n)]
+
+    def to_text(self) -> str:
+        """Render as a flat Playwright-style snapshot (for logs and success checks)."""
+        lines = []
+        for e in self.elements():
+            line = f"- {e['role']}"
+            if e['name']:
+                line += ' "' + e['name'].replace('"', '\\"') + '"'
+            if e['ref']:
+                line += f" [ref={e['ref']}]"
+            if e['value']:
+                line += f": {e['value']}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def __str__(self) -> str:
+        return self.to_text()
+
+    def __repr__(self) -> str:
+        return f"Observation(step={self.step}, elements={len(self)}, url={self.url!r})"
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by this observation's id array (strings are shared)."""
+        return self._ids.itemsize * len(self._ids)
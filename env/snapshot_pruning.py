@@ -0,0 +1,282 @@
+"""Prune accessibility snapshots down to the task-relevant form subtree.
+
+Handles both snapshot shapes the env sees:
+
+- text snapshots from Playwright MCP (an indented ``- role "name" [ref=eN]``
+  tree, possibly wrapped in a "Page state" header), which are pruned line-wise
+  so the result is still a valid snapshot with the original refs, and
+- dict snapshots with a flat ``elements`` list (mock pages and demos).
+
+Elements are scored for relevance (task-referenced, validation messages, form
+controls, buttons, anything inside a ``form``; page chrome such as
+navigation, footers and cookie banners is penalized) and the top
+``max_elements`` are kept. For text snapshots the ancestors of every kept
+element are kept too, so indentation and nesting stay intact.
+"""
+
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+FORM_CONTROL_ROLES = frozenset({
+    'textbox', 'searchbox', 'combobox', 'checkbox', 'radio', 'spinbutton',
+    'slider', 'switch', 'listbox', 'option', 'radiogroup',
+})
+BUTTON_ROLES = frozenset({'button'})
+VALIDATION_ROLES = frozenset({'alert', 'status'})
+CONTAINER_ROLES = frozenset({'form', 'group', 'radiogroup', 'fieldset'})
+CHROME_ROLES = frozenset({'banner', 'navigation', 'contentinfo', 'complementary'})
+# Roles of text nodes that can carry a validation message without being an element
+MESSAGE_ROLES = frozenset({'text', 'paragraph', 'generic'})
+# Roles that score above zero on their own
+SCORED_ROLES = FORM_CONTROL_ROLES | BUTTON_ROLES | VALIDATION_ROLES
+
+VALIDATION_WORDS = ['required', 'invalid', 'must', 'error',
+                    'please (?:enter|fill|select|specify)', 'not valid']
+VALIDATION_PATTERN = re.compile(r'\b(' + '|'.join(VALIDATION_WORDS) + r')\b', re.I)
+SUBMIT_PATTERN = re.compile(r'\b(submit|send|continue|next|sign ?up|register|save|apply)\b', re.I)
+CHROME_PATTERN = re.compile(r'\b(cookie|cookies|advert|sponsored|newsletter popup)\b', re.I)
+
+_NAME_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_SELECTOR_TERM_RE = re.compile(r"""[#.]([\w-]+)|\[\s*name\s*=\s*['"]?([\w-]+)""")
+# Words of selector ids and labels that say nothing about which element is meant
+STOPWORDS = frozenset({
+    'the', 'and', 'for', 'you', 'your', 'our', 'with', 'from', 'this', 'that', 'are',
+    'input', 'btn', 'field',
+})
+
+
+def _task_terms(task_config: Dict[str, Any]) -> List[str]:
+    """Lower-cased strings from the task config that identify relevant elements."""
+    terms = []
+    for key in ('fields', 'field_labels', 'field_names'):
+        terms.extend(str(v) for v in task_config.get(key, []) or [])
+    for key in ('field_selector', 'submit_selector'):
+        selector = task_config.get(key)
+        if not selector:
+            continue
+        matches = _SELECTOR_TERM_RE.findall(selector)
+        if matches:
+            terms.extend(a or b for a, b in matches)
+        elif not any(c in selector for c in '#.[]=:>'):
+            # Plain text (e.g. a button label) rather than a CSS selector
+            terms.append(selector)
+    # Selector ids like "name-input" should also match the label "Name"
+    expanded = []
+    for term in terms:
+        term = term.lower().strip()
+        if not term:
+            continue
+        expanded.append(term)
+        for part in re.split(r'[-_\s]+', term):
+            if len(part) > 2 and part not in STOPWORDS:
+                expanded.append(part)
+    # The success message only matches as a whole phrase
+    success = task_config.get('success_condition')
+    if isinstance(success, str):
+        expanded.append(success.lower())
+    # Trim punctuation so every term can be matched on word boundaries
+    expanded = (re.sub(r'^\W+|\W+$', '', term) for term in expanded)
+    return sorted(set(term for term in expanded if term))
+
+
+def _words_pattern(alternatives: List[str]) -> Optional[re.Pattern]:
+    """Regex matching any of ``alternatives`` as whole words of lower-cased text."""
+    if not alternatives:
+        return None
+    # Longest first so a phrase wins over its own first word
+    alternatives = sorted(alternatives, key=len, reverse=True)
+    return re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b')
+
+
+def _inline(body: str) -> str:
+    """Text after the last colon, e.g. "text: Email is required" -> " Email is required"."""
+    return body.rsplit(':', 1)[1] if ':' in body and not body.endswith(':') else ''
+
+
+def validation_messages(snapshot: Any) -> List[str]:
+    """Validation text that parse_elements does not return as an element.
+
+    That is text matching VALIDATION_PATTERN on ``text``/``paragraph`` nodes
+    without a ref (e.g. ``- text: Email is required``) or on ``generic``
+    containers, in document order. Ref-bearing ``alert``/``status`` nodes are
+    elements already.
+    """
+    messages = []
+    if isinstance(snapshot, dict):
+        for element in snapshot.get('elements', []):
+            role = str(element.get('type') or element.get('role') or '')
+            if role not in MESSAGE_ROLES or (element.get('ref') and role != 'generic'):
+                continue
+            text = ' '.join(str(element.get(k) or '') for k in ('name', 'value')).strip()
+            if VALIDATION_PATTERN.search(text):
+                messages.append(text)
+        return messages
+    if not isinstance(snapshot, str):
+        return messages
+    for line in snapshot.split('\n'):
+        stripped = line.lstrip()
+        if not stripped.startswith('- '):
+            continue
+        body = stripped[2:]
+        role = body.partition(' ')[0].rstrip(':').lower()
+        if role not in MESSAGE_ROLES or ('[ref=' in body and role != 'generic'):
+            continue
+        name_match = _NAME_RE.search(body) if role != 'text' else None
+        text = ' '.join(part for part in (name_match.group(1) if name_match else '',
+                                          _inline(body).strip()) if part)
+        if VALIDATION_PATTERN.search(text):
+            messages.append(text)
+    return messages
+
+
+class SnapshotPruner:
+    """Keeps the task-relevant part of a snapshot, capped at max_elements."""
+
+    def __init__(self, task_config: Dict[str, Any], max_elements: int = 64):
+        """
+        Args:
+            task_config: task dict; field labels/selectors, submit selector
+                and success condition mark elements as task-referenced
+            max_elements: cap on kept ref-bearing elements (0 disables the cap)
+        """
+        self.max_elements = max_elements
+        self.terms = _task_terms(task_config)
+        escaped = [re.escape(term) for term in self.terms]
+        self._terms_re = _words_pattern(escaped)
+        # Text that can earn an element a positive score whatever its role
+        # (task terms, validation wording); other elements whose role scores
+        # nothing are dropped without being scored
+        self._promising_re = _words_pattern(escaped + VALIDATION_WORDS)
+
+    def _referenced(self, text: str) -> bool:
+        return self._terms_re is not None and self._terms_re.search(text.lower()) is not None
+
+    def _score(self, role: str, text: str, in_form: bool, in_chrome: bool) -> float:
+        """Relevance score of one element; <= 0 means drop."""
+        score = 0.0
+        if self._referenced(text):
+            score += 10.0
+        if role in VALIDATION_ROLES or VALIDATION_PATTERN.search(text):
+            score += 8.0
+        if role in FORM_CONTROL_ROLES:
+            score += 5.0
+        elif role in BUTTON_ROLES:
+            score += 4.0 if SUBMIT_PATTERN.search(text) or in_form else 1.0
+        if in_form and score > 0:
+            score += 2.0
+        elif in_form and role == 'heading':
+            score += 1.0
+        if in_chrome or CHROME_PATTERN.search(text):
+            score -= 6.0
+        return score
+
+    def _select(self, scored: List[Tuple[int, float]]) -> List[int]:
+        """Indices of the top-scoring elements, in document order."""
+        candidates = [(score, i) for i, score in scored if score > 0]
+        if self.max_elements and len(candidates) > self.max_elements:
+            candidates.sort(key=lambda c: (-c[0], c[1]))
+            candidates = candidates[:self.max_elements]
+        return sorted(i for _, i in candidates)
+
+    def prune(self, snapshot: Any) -> Tuple[Any, Dict[str, Any]]:
+        """Return (pruned snapshot, stats).
+
+        stats: original/kept element counts, original/kept size in characters
+        and 'ratio' = kept size / original size (1.0 means nothing pruned).
+        """
+        if isinstance(snapshot, str):
+            pruned, original_count, kept_count = self._prune_text(snapshot)
+        elif isinstance(snapshot, dict) and isinstance(snapshot.get('elements'), list):
+            pruned, original_count, kept_count = self._prune_elements(snapshot)
+        else:
+            return snapshot, {'original_elements': 0, 'kept_elements': 0, 'ratio': 1.0}
+        original_size = len(str(snapshot))
+        kept_size = len(str(pruned))
+        return pruned, {
+            'original_elements': original_count,
+            'kept_elements': kept_count,
+            'original_chars': original_size,
+            'kept_chars': kept_size,
+            'ratio': kept_size / original_size if original_size else 1.0,
+        }
+
+    def _prune_elements(self, snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], int, int]:
+        elements = snapshot['elements']
+        scored = []
+        for i, element in enumerate(elements):
+            role = str(element.get('type') or element.get('role') or '')
+            text = ' '.join(str(element.get(k, '')) for k in ('name', 'value'))
+            scored.append((i, self._score(role, text, in_form=True, in_chrome=False)))
+        keep = self._select(scored)
+        pruned = dict(snapshot)
+        pruned['elements'] = [elements[i] for i in keep]
+        return pruned, len(elements), len(keep)
+
+    def _prune_text(self, snapshot: str) -> Tuple[str, int, int]:
+        lines = snapshot.split('\n')
+        # Parse the indented tree: parent index, role and context per node line
+        parents: List[Optional[int]] = [None] * len(lines)
+        is_node = [False] * len(lines)
+        has_ref = [False] * len(lines)
+        scored = []
+        stack: List[Tuple[int, int, bool, bool]] = []  # (indent, line index, in_form, in_chrome)
+        # MCP wraps the tree in a ```yaml fence after "- Page URL:" style
+        # header lines; only fenced lines are tree nodes when a fence exists.
+        fenced = any(line.startswith('```') for line in lines)
+        in_tree = not fenced
+        for i, line in enumerate(lines):
+            if line.startswith('```'):
+                in_tree = not in_tree
+                stack = []
+                continue
+            stripped = line.lstrip() if in_tree else ''
+            if not stripped.startswith('- '):
+                stack = []
+                continue
+            indent = len(line) - len(stripped)
+            body = stripped[2:]
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            parent = stack[-1] if stack else None
+            parents[i] = parent[1] if parent else None
+            in_form = parent[2] if parent else False
+            in_chrome = parent[3] if parent else False
+            is_node[i] = True
+
+            role, _, after = body.partition(' ')
+            role = role.rstrip(':').lower()
+            name_match = _NAME_RE.match(after) if after.startswith('"') else None
+            name = name_match.group(1) if name_match else ''
+            if '[ref=' in body:
+                has_ref[i] = True
+                text = f"{name} {_inline(body)}"
+                # Only score elements that can end up above zero
+                if (role in SCORED_ROLES or (in_form and role == 'heading')
+                        or self._promising_re.search(text.lower())):
+                    scored.append((i, self._score(role, text, in_form, in_chrome)))
+            elif role in MESSAGE_ROLES:
+                inline = _inline(body)
+                if VALIDATION_PATTERN.search(inline):
+                    # Un-ref'd validation text still matters
+                    has_ref[i] = True
+                    scored.append((i, self._score('alert', inline, in_form, in_chrome)))
+            stack.append((indent, i,
+                          in_form or role in CONTAINER_ROLES,
+                          in_chrome or role in CHROME_ROLES
+                          or bool(name and CHROME_PATTERN.search(name))))
+
+        selected = self._select(scored)
+        keep = [not is_node[i] for i in range(len(lines))]
+        for i in selected:
+            node = i
+            while node is not None and not keep[node]:
+                keep[node] = True
+                node = parents[node]
+        # Property lines without refs (e.g. "- /url: ...", option text) follow
+        # their kept parent
+        selected_set = set(selected)
+        for i in range(len(lines)):
+            if is_node[i] and not keep[i] and not has_ref[i] and parents[i] in selected_set:
+                keep[i] = True
+        pruned = '\n'.join(line for line, k in zip(lines, keep) if k)
+        return pruned, sum(has_ref), len(selected)
@@ -0,0 +1,107 @@
+"""Synthetic Playwright MCP snapshots of realistic size.
+
+Used wherever real pages are not at hand: the export parity check's default
+held-out set, the benchmarks and the stub MCP server. Pages follow the shape
+of real ``browser_snapshot`` output: a "Page state" header, then a fenced
+YAML tree with a navigation banner, a form, body copy and a footer. Three
+presets span the range seen on real forms:
+
+- small: about 2.5 KB, a bare single-form page
+- medium: about 23 KB, a typical marketing page around a signup form
+- large: about 90 KB, a content-heavy page with long navigation and footer
+"""
+
+import random
+from typing import Dict, List
+
+SNAPSHOT_SIZES = {
+    'small': {'nav_links': 6, 'fields': 3, 'paragraphs': 4, 'footer_links': 6},
+    'medium': {'nav_links': 60, 'fields': 8, 'paragraphs': 60, 'footer_links': 80},
+    'large': {'nav_links': 250, 'fields': 16, 'paragraphs': 240, 'footer_links': 300},
+}
+
+FIELD_LABELS = ['Full name', 'Email', 'Phone', 'Company', 'Job title', 'Address',
+                'City', 'Postal code', 'Country', 'Website', 'Age', 'Username',
+                'Password', 'Referral code', 'Team size', 'Budget']
+FIELD_VALUES = {'Email': 'jane@example.com', 'Phone': '555-0100', 'Age': '34',
+                'Postal code': '94107', 'Website': 'https://example.com'}
+SUCCESS_TEXT = 'Thanks for submitting'
+
+_WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+          'incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud').split()
+
+
+def form_fields(size: str = 'medium') -> List[str]:
+    """Labels of the form fields on a page of the given size."""
+    return FIELD_LABELS[:SNAPSHOT_SIZES[size]['fields']]
+
+
+def synthetic_snapshot(size: str = 'medium', seed: int = 0, filled: int = 0,
+                       submitted: bool = False) -> str:
+    """Build one text snapshot.
+
+    Args:
+        size: key of SNAPSHOT_SIZES
+        seed: varies link labels and body text between pages
+        filled: number of form fields that already hold a value
+        submitted: include the success message
+    """
+    spec = SNAPSHOT_SIZES[size]
+    rng = random.Random(f"{size}:{seed}")
+    refs = iter(range(1, 1 << 30))
+    lines = ['### Page state', '- Page URL: https://forms.example.com/signup',
+             '- Page Title: Sign up', '- Page Snapshot:', '```yaml']
+
+    def node(indent: int, body: str, children: bool = False):
+        suffix = ':' if children else ''
+        lines.append(f"{'  ' * indent}- {body} [ref=e{next(refs)}]{suffix}")
+
+    def sentence(n: int) -> str:
+        return ' '.join(rng.choice(_WORDS) for _ in range(n)).capitalize() + '.'
+
+    node(0, 'generic', children=True)
+    node(1, 'banner', children=True)
+    node(2, 'link "Home"', children=True)
+    lines.append('      - /url: /')
+    node(2, 'navigation', children=True)
+    node(3, 'list', children=True)
+    for i in range(spec['nav_links']):
+        node(4, 'listitem', children=True)
+        node(5, f'link "{sentence(2)[:-1]} {i}"', children=True)
+        lines.append(f"            - /url: /section/{i}")
+    node(1, 'main', children=True)
+    node(2, 'heading "Create your account" [level=1]')
+    node(2, 'form', children=True)
+    for i, label in enumerate(form_fields(size)):
+        node(3, 'group', children=True)
+        lines.append(f"        - text: {label}")
+        value = FIELD_VALUES.get(label, 'John Doe') if i < filled else ''
+        line_end = f": {value}" if value else ''
+        lines.append(f'        - textbox "{label}" [ref=e{next(refs)}]{line_end}')
+    node(3, 'checkbox "Subscribe to updates"')
+    node(3, 'button "Submit"')
+    if submitted:
+        node(2, f'status: {SUCCESS_TEXT}')
+    for _ in range(spec['paragraphs']):
+        node(2, f'paragraph: {sentence(rng.randint(12, 30))}')
+    node(1, 'contentinfo', children=True)
+    for i in range(spec['footer_links']):
+        node(2, f'link "{sentence(3)[:-1]}"', children=True)
+        lines.append(f"      - /url: /footer/{i}")
+    node(1, 'region "Cookie consent"', children=True)
+    node(2, 'button "Accept cookies"')
+    lines.append('```')
+    return '\n'.join(lines)
+
+
+def snapshot_task(size: str = 'medium', **overrides) -> Dict:
+    """Task config matching the synthetic page."""
+    task = {
+        'url': 'https://forms.example.com/signup',
+        'fields': form_fields(size),
+        'submit_selector': 'Submit',
+        'success_condition': SUCCESS_TEXT,
+        'max_steps': 50,
+    }
+    task.update(overrides)
+    return task
@@ -0,0 +1,146 @@
+"""Quantized, compiled inference-only policy for CPU rollout workers."""
+
+import copy
+import os
+from typing import Dict, Any, Optional
+
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+BACKENDS = ('torchscript', 'compile', 'eager')
+
+
+def quantize_policy(policy: nn.Module) -> nn.Module:
+    """Return an eval-mode copy of policy with dynamically int8-quantized Linear layers."""
+    float_copy = copy.deepcopy(policy).to('cpu').eval()
+    return torch.ao.quantization.quantize_dynamic(float_copy, {nn.Linear}, dtype=torch.qint8)
+
+
+def export_inference_policy(policy: nn.Module, example_obs: torch.Tensor,
+                            path: Optional[str] = None, backend: str = 'torchscript') -> nn.Module:
+    """Build an inference-only policy: int8 dynamic quantization plus a compiled graph.
+
+    Args:
+        policy: float PolicyNetwork (left untouched)
+        example_obs: representative observation batch used for tracing
+        path: if given and backend is 'torchscript', save the traced module here
+        backend: 'torchscript' (traced and frozen), 'compile' (torch.compile)
+            or 'eager' (quantization only)
+
+    Returns:
+        module mapping obs -> (logits, value)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    quantized = quantize_policy(policy)
+    if backend == 'torchscript':
+        with torch.inference_mode():
+            module = torch.jit.freeze(torch.jit.trace(quantized, example_obs.cpu(), check_trace=False))
+        if path:
+            save_inference_policy(module, path)
+        return module
+    if path:
+        raise ValueError("Only the 'torchscript' backend can be saved to a file")
+    if backend == 'compile':
+        return torch.compile(quantized, dynamic=True)
+    return quantized
+
+
+def save_inference_policy(module: nn.Module, path: str):
+    """Save a TorchScript policy atomically: readers see the old file or the new one."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    try:
+        torch.jit.save(module, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_inference_policy(path: str) -> nn.Module:
+    """Load a policy saved by export_inference_policy."""
+    return torch.jit.load(path, map_location='cpu')
+
+
+@torch.inference_mode()
+def parity_check(float_policy: nn.Module, inference_policy: nn.Module,
+                 observations: torch.Tensor, min_agreement: float = 0.95,
+                 max_kl: float = 0.01, masks: Optional[torch.Tensor] = None) -> Dict[str, Any]:
+    """Compare an exported policy against the float model on held-out observations.
+
+    Greedy-action agreement is sensitive to near-tied logits, so the KL
+    bound is the stricter check for a well-trained policy. With ``masks``
+    (N x action_dim bool), both are computed over the allowed actions only,
+    as the rollout sees them.
+
+    Returns:
+        dict with 'action_agreement' (fraction of equal greedy actions),
+        'kl' (mean KL(float || exported) of the action distributions),
+        'max_value_error' and 'passed'
+    """
+    was_training = float_policy.training
+    float_policy.eval()
+    try:
+        ref_logits, ref_value = float_policy(observations)
+    finally:
+        float_policy.train(was_training)
+    logits, value = inference_policy(observations)
+    if masks is not None:
+        ref_logits = ref_logits.masked_fill(~masks, -1e9)
+        logits = logits.masked_fill(~masks, -1e9)
+
+    agreement = (ref_logits.argmax(-1) == logits.argmax(-1)).float().mean().item()
+    ref_log_probs = F.log_softmax(ref_logits, dim=-1)
+    log_probs = F.log_softmax(logits, dim=-1)
+    kl = (ref_log_probs.exp() * (ref_log_probs - log_probs)).sum(-1).mean().item()
+    value_error = (ref_value - value).abs().max().item()
+    return {
+        'action_agreement': agreement,
+        'kl': kl,
+        'max_value_error': value_error,
+        'passed': agreement >= min_agreement and kl <= max_kl,
+    }
+
+
+class InferencePolicy:
+    """Rollout-side policy copy that re-exports itself when new weights arrive.
+
+    Keeps one float template module; ``refresh()`` copies broadcast weights
+    into it in place and rebuilds the quantized graph, which for this model
+    size takes tens of milliseconds.
+    """
+
+    def __init__(self, policy: nn.Module, example_obs: torch.Tensor,
+                 backend: str = 'torchscript'):
+        self.template = copy.deepcopy(policy).to('cpu').eval()
+        self.example_obs = example_obs.cpu()
+        self.backend = backend
+        self.version = None
+        self.module = export_inference_policy(self.template, self.example_obs, backend=backend)
+
+    @torch.inference_mode()
+    def refresh(self, state_dict: Dict[str, torch.Tensor], version: Optional[int] = None):
+        """Load new learner weights; no-op if ``version`` is already loaded."""
+        if version is not None and version == self.version:
+            return
+        for name, tensor in self.template.state_dict().items():
+            tensor.copy_(state_dict[name])
+        self.module = export_inference_policy(self.template, self.example_obs, backend=self.backend)
+        self.version = version
+
+    @torch.inference_mode()
+    def __call__(self, obs: torch.Tensor):
+        return self.module(obs)
+
+    @torch.inference_mode()
+    def act(self, obs: torch.Tensor, mask: Optional[torch.Tensor] = None,
+            deterministic: bool = False):
+        """Return (action, log_prob, value) for a batch of observations."""
+        logits, value = self.module(obs)
+        if mask is not None:
+            logits = logits.masked_fill(~mask, -1e9)
+        dist = torch.distributions.Categorical(logits=logits)
+        action = logits.argmax(-1) if deterministic else dist.sample()
+        return action, dist.log_prob(action), value.squeeze(-1)
@@ -3,6 +3,8 @@
 import torch
 import torch.nn as nn
 
+from utils import tracing
+
 class PolicyNetwork(nn.Module):
     """Transformer-based policy with value head."""
     
@@ -17,8 +19,25 @@ class PolicyNetwork(nn.Module):
     
     def forward(self, obs):
         """Forward pass: returns action logits and value estimate."""
-        features = self.encoder(obs)
-        logits = self.policy_head(features)
-        value = self.value_head(features)
+        with tracing.span('PolicyNetwork.forward', 'policy'):
+            features = self.encoder(obs)
+            logits = self.policy_head(features)
+            value = self.value_head(features)
         return logits, value
+    
+    @torch.no_grad()
+    def act(self, obs, mask=None, deterministic=False):
+        """Return (action, log_prob, value) for a batch of observations.
+        
+        Args:
+            obs: [batch, obs_dim] tensor
+            mask: optional [batch, action_dim] bool tensor of allowed actions
+            deterministic: take the argmax instead of sampling
+        """
+        logits, value = self(obs)
+        if mask is not None:
+            logits = logits.masked_fill(~mask, -1e9)
+        dist = torch.distributions.Categorical(logits=logits)
+        action = logits.argmax(-1) if deterministic else dist.sample()
+        return action, dist.log_prob(action), value.squeeze(-1)
 
@@ -1,10 +1,34 @@
 """Evaluation script."""
 
+import os
 import sys
 sys.path.append('..')
 
+import torch
+
 from env.browser_env import BrowserEnv
 from models.policy import PolicyNetwork
+from utils.checkpoint import POLICY_SHARD, CheckpointManager, load_shard
+
+
+def load_policy(checkpoint, obs_dim=None):
+    """Build a PolicyNetwork from a checkpoint, memory-mapping its weights.
+    
+    ``checkpoint`` may be a CheckpointManager root (latest is used), a single
+    checkpoint directory, or a file written by save_model.
+    """
+    if os.path.isdir(checkpoint) and not os.path.exists(os.path.join(checkpoint, POLICY_SHARD)):
+        checkpoint = CheckpointManager(checkpoint).latest()
+    if os.path.isdir(checkpoint):
+        checkpoint = os.path.join(checkpoint, POLICY_SHARD)
+    state_dict = load_shard(checkpoint, mmap=True)
+    action_dim, hidden_dim = state_dict['policy_head.weight'].shape
+    # Build on the meta device and assign the mmapped tensors: no weight copy
+    with torch.device('meta'):
+        policy = PolicyNetwork(obs_dim or hidden_dim, action_dim, hidden_dim)
+    policy.load_state_dict(state_dict, assign=True)
+    policy.eval()
+    return policy
 
 def evaluate(policy, test_tasks):
     """Run policy on test tasks and record success rate."""
@@ -25,4 +49,3 @@ def evaluate(policy, test_tasks):
 if __name__ == '__main__':
     # Placeholder: load policy, test_tasks, run evaluation
     pass
-
@@ -0,0 +1,83 @@
+"""Export a checkpointed policy to a quantized TorchScript file for rollout workers.
+
+The file is written only if the exported policy passes the parity check
+against the float policy; an existing file at ``--output`` is left untouched
+otherwise.
+"""
+
+import argparse
+import sys
+sys.path.append('..')
+
+import torch
+
+from env.featurizer import ACTION_TYPES, SnapshotFeaturizer
+from env.snapshot_pruning import SnapshotPruner
+from env.synthetic_pages import SNAPSHOT_SIZES, form_fields, snapshot_task, synthetic_snapshot
+from models.inference import export_inference_policy, parity_check, save_inference_policy
+from scripts.evaluate import load_policy
+from utils.serialization import iter_demos
+
+
+def held_out_observations(featurizer, demos_path=None, seeds=8):
+    """Featurized snapshots and their action masks for the parity check.
+
+    Synthetic pages of every size at every fill state, pruned the way
+    BrowserEnv prunes them, plus every observation in ``demos_path``.
+    """
+    snapshots = []
+    for size in SNAPSHOT_SIZES:
+        pruner = SnapshotPruner(snapshot_task(size))
+        for seed in range(seeds):
+            pages = [synthetic_snapshot(size, seed, filled)
+                     for filled in range(len(form_fields(size)) + 1)]
+            pages.append(synthetic_snapshot(size, seed, len(form_fields(size)), submitted=True))
+            snapshots.extend(pruner.prune(page)[0] for page in pages)
+    if demos_path:
+        for demo in iter_demos(demos_path):
+            snapshots.extend(demo['observations'])
+    observations, masks = [], []
+    for snapshot in snapshots:
+        obs, elements = featurizer.featurize(snapshot)
+        observations.append(obs)
+        masks.append(featurizer.action_mask(elements))
+    return torch.stack(observations), torch.stack(masks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checkpoint', required=True,
+                        help='checkpoint root, checkpoint directory or model file')
+    parser.add_argument('--output', required=True, help='path for the TorchScript file')
+    parser.add_argument('--obs', help='held-out observations saved with torch.save (N x obs_dim); '
+                                      'featurized synthetic and demo snapshots are used if omitted')
+    parser.add_argument('--demos', default='data/demos',
+                        help='demo file or directory added to the default held-out set')
+    parser.add_argument('--min-agreement', type=float, default=0.95)
+    parser.add_argument('--max-kl', type=float, default=0.01)
+    args = parser.parse_args()
+
+    policy = load_policy(args.checkpoint)
+    masks = None
+    if args.obs:
+        observations = torch.load(args.obs, map_location='cpu', weights_only=True)
+    else:
+        featurizer = SnapshotFeaturizer(
+            obs_dim=policy.policy_head.in_features,
+            max_elements=policy.policy_head.out_features // len(ACTION_TYPES))
+        observations, masks = held_out_observations(featurizer, args.demos)
+
+    exported = export_inference_policy(policy, observations[:8])
+    report = parity_check(policy, exported, observations, min_agreement=args.min_agreement,
+                          max_kl=args.max_kl, masks=masks)
+    print(f"observations={len(observations)} action_agreement={report['action_agreement']:.4f} "
+          f"kl={report['kl']:.6f} max_value_error={report['max_value_error']:.4f}")
+    if not report['passed']:
+        print("Parity check failed; nothing written")
+        sys.exit(1)
+    save_inference_policy(exported, args.output)
+    print(f"Exported {args.output}")
+
+
+if __name__ == '__main__':
+    main()
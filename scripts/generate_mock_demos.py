@@ -1,22 +1,82 @@
-"""Generate mock expert demonstrations."""
+"""Generate mock expert demonstrations.
 
+Procedurally generates form layouts (field count, types, labels, validation
+rules, dynamically revealed fields), runs a scripted expert on each, and
+streams the trajectories into gzip-compressed JSONL shards with a manifest.
+Shards are generated in parallel across a process pool; each shard is seeded
+from (seed, shard index), so output is identical for a given seed regardless
+of worker count.
+
+    python scripts/generate_mock_demos.py --num-demos 1000000 --workers 16
+
+``--legacy`` writes the three original hand-written single-field demos.
+"""
+
+import argparse
+import copy
+import gzip
+import hashlib
 import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+GENERATOR_VERSION = 1
+
+FIELD_KINDS = {
+    # kind: (element type, label choices)
+    'name': ('textbox', ['Name', 'Full name', 'Your name', 'First name', 'Last name']),
+    'email': ('textbox', ['Email', 'Email address', 'E-mail', 'Work email']),
+    'phone': ('textbox', ['Phone', 'Phone number', 'Mobile', 'Telephone']),
+    'number': ('spinbutton', ['Age', 'Quantity', 'Number of guests', 'Zip code']),
+    'message': ('textbox', ['Message', 'Comments', 'Feedback', 'Description']),
+    'choice': ('combobox', ['Country', 'Department', 'Topic', 'Plan']),
+    'consent': ('checkbox', ['I agree to the terms', 'Subscribe to newsletter',
+                             'Remember me', 'I am not a robot']),
+}
+
+VALUES = {
+    'name': ['John Doe', 'Ada Lovelace', 'Grace Hopper', 'Alan Turing', 'Maria Garcia'],
+    'email': ['user@example.com', 'ada@example.org', 'test@mail.com', 'hello@site.net'],
+    'phone': ['555-0100', '+1 202 555 0143', '(415) 555-2671', '020 7946 0018'],
+    'number': ['3', '42', '10001', '7'],
+    'message': ['Hello world', 'Please call me back', 'Great product!', 'N/A'],
+}
+
+CHOICE_OPTIONS = [['USA', 'Canada', 'Mexico'], ['Sales', 'Support', 'Billing'],
+                  ['General', 'Bug report', 'Feature request'], ['Free', 'Pro', 'Team']]
+
+# Format validation: kind -> (check, error message template)
+FORMAT_RULES = {
+    'email': (lambda v: '@' in v and '.' in v.split('@')[-1], "Enter a valid {label}"),
+    'phone': (lambda v: sum(c.isdigit() for c in v) >= 7, "{label} must have at least 7 digits"),
+    'number': (lambda v: v.isdigit(), "{label} must be a number"),
+}
+INVALID_VALUES = {
+    'email': ['user@', 'example.com', 'john at mail'],
+    'phone': ['call me', '555', 'n/a'],
+    'number': ['ten', 'abc', '4x'],
+}
+
+SUBMIT_LABELS = ['Submit', 'Send', 'Continue', 'Sign up', 'Register', 'Save']
+SUCCESS_MESSAGES = ['Thank you', 'Your response has been recorded', 'Success', 'Thanks for signing up']
+
 
 def create_mock_snapshot(url, elements):
     """Create mock accessibility snapshot."""
     return {
         "type": "snapshot",
         "url": url,
-        "elements": elements
+        "elements": copy.deepcopy(elements)
     }
 
 
 def generate_mock_demo(task_config, actions_data):
     """
     Generate a mock demonstration.
-    
+
     Args:
         task_config: Task configuration dict
         actions_data: List of (action_type, element_ref, description, text) tuples
@@ -25,16 +85,16 @@ def generate_mock_demo(task_config, actions_data):
     actions = []
     rewards = []
     dones = []
-    
+
     url = task_config['url']
-    
+
     # Initial state
-    initial_elements = [
+    elements = [
         {"ref": "e1", "type": "textbox", "name": "Input", "value": ""},
         {"ref": "e2", "type": "button", "name": "Submit"}
     ]
-    observations.append(create_mock_snapshot(url, initial_elements))
-    
+    observations.append(create_mock_snapshot(url, elements))
+
     # Execute actions
     for i, (action_type, element_ref, description, text) in enumerate(actions_data):
         # Action
@@ -44,11 +104,10 @@ def generate_mock_demo(task_config, actions_data):
             "description": description,
             "text": text
         })
-        
+
         # Update state after action
         if action_type == "type":
             # Update input value
-            elements = initial_elements.copy()
             elements[0]["value"] = text
             observations.append(create_mock_snapshot(url, elements))
         elif action_type == "submit":
@@ -59,8 +118,8 @@ def generate_mock_demo(task_config, actions_data):
             observations.append(create_mock_snapshot(url + "/success", success_elements))
         else:
             # Click - state unchanged
-            observations.append(create_mock_snapshot(url, initial_elements))
-        
+            observations.append(create_mock_snapshot(url, elements))
+
         # Rewards and dones
         if action_type == "submit":
             rewards.append(1.0)
@@ -68,7 +127,7 @@ def generate_mock_demo(task_config, actions_data):
         else:
             rewards.append(0.0)
             dones.append(False)
-    
+
     return {
         "task": task_config,
         "observations": observations,
@@ -78,64 +137,348 @@ def generate_mock_demo(task_config, actions_data):
     }
 
 
-def main():
-    """Generate multiple mock demonstrations."""
-    demo_dir = Path("data/demos")
+def random_form_layout(rng, min_fields=1, max_fields=6, dynamic_prob=0.3):
+    """
+    Sample a random form layout.
+
+    Returns:
+        dict with keys:
+            - url, submit_label, success_message
+            - fields: list of field dicts (kind, type, label, required,
+              options, reveals) in page order; a field with ``reveals`` set
+              shows that hidden field once it has been filled or checked
+    """
+    num_fields = rng.randint(min_fields, max_fields)
+    kinds = list(FIELD_KINDS)
+    fields = []
+    for _ in range(num_fields):
+        kind = rng.choice(kinds)
+        element_type, labels = FIELD_KINDS[kind]
+        field = {
+            'kind': kind,
+            'type': element_type,
+            'label': rng.choice(labels),
+            'required': rng.random() < 0.7,
+            'hidden': False,
+            'reveals': None,
+        }
+        if kind == 'choice':
+            field['options'] = rng.choice(CHOICE_OPTIONS)
+        fields.append(field)
+
+    # Dynamic field: a checkbox/choice that reveals a follow-up textbox
+    if rng.random() < dynamic_prob:
+        trigger_index = rng.randrange(len(fields) + 1)
+        follow_up = {'kind': 'message', 'type': 'textbox', 'label': 'Please specify',
+                     'required': True, 'hidden': True, 'reveals': None}
+        trigger = {'kind': 'consent', 'type': 'checkbox', 'label': 'Other',
+                   'required': False, 'hidden': False, 'reveals': trigger_index + 1}
+        fields[trigger_index:trigger_index] = [trigger, follow_up]
+
+    slug = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(8))
+    return {
+        'url': f"https://example.com/forms/{slug}",
+        'fields': fields,
+        'submit_label': rng.choice(SUBMIT_LABELS),
+        'success_message': rng.choice(SUCCESS_MESSAGES),
+    }
+
+
+class MockForm:
+    """Minimal simulator of a form page driven by env-style actions."""
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.url = layout['url']
+        self.fields = copy.deepcopy(layout['fields'])
+        self.values = [''] * len(self.fields)
+        self.checked = [False] * len(self.fields)
+        self.errors = []
+        self.submitted = False
+        self.submit_ref = f"e{len(self.fields) + 1}"
+
+    @staticmethod
+    def ref(index):
+        return f"e{index + 1}"
+
+    def index_of(self, ref):
+        return int(ref[1:]) - 1
+
+    def visible(self, index):
+        return not self.fields[index]['hidden']
+
+    def filled(self, index):
+        field = self.fields[index]
+        return self.checked[index] if field['type'] == 'checkbox' else bool(self.values[index])
+
+    def missing_required(self):
+        return [i for i, f in enumerate(self.fields)
+                if f['required'] and self.visible(i) and not self.filled(i)]
+
+    def invalid(self):
+        return [i for i, f in enumerate(self.fields)
+                if f['kind'] in FORMAT_RULES and self.visible(i) and self.values[i]
+                and not FORMAT_RULES[f['kind']][0](self.values[i])]
+
+    def _reveal(self, index):
+        target = self.fields[index]['reveals']
+        if target is not None:
+            self.fields[target]['hidden'] = not self.filled(index)
+
+    def apply(self, action):
+        """Apply an action dict; returns True if the form was submitted successfully."""
+        action_type = action['type']
+        if action_type == 'submit':
+            missing = self.missing_required()
+            invalid = self.invalid()
+            self.errors = [f"{self.fields[i]['label']} is required" for i in missing]
+            self.errors += [FORMAT_RULES[self.fields[i]['kind']][1].format(label=self.fields[i]['label'])
+                            for i in invalid]
+            self.submitted = not missing and not invalid
+            return self.submitted
+        index = self.index_of(action['element_ref'])
+        if index >= len(self.fields):
+            return False
+        field = self.fields[index]
+        if action_type == 'click' and field['type'] == 'checkbox':
+            self.checked[index] = not self.checked[index]
+            self._reveal(index)
+        elif action_type == 'type':
+            self.values[index] = action['text']
+            self._reveal(index)
+        return False
+
+    def snapshot(self):
+        if self.submitted:
+            success = self.layout['success_message']
+            return create_mock_snapshot(self.url + "/success", [
+                {"ref": self.ref(len(self.fields) + 1), "type": "heading", "name": success,
+                 "value": f"{success}!"}
+            ])
+        elements = []
+        for i, field in enumerate(self.fields):
+            if not self.visible(i):
+                continue
+            element = {"ref": self.ref(i), "type": field['type'], "name": field['label']}
+            if field['type'] == 'checkbox':
+                element['checked'] = self.checked[i]
+            else:
+                element['value'] = self.values[i]
+            if field['required']:
+                element['required'] = True
+            if field['type'] == 'combobox':
+                element['options'] = list(field['options'])
+            elements.append(element)
+        for j, message in enumerate(self.errors):
+            elements.append({"ref": f"e{len(self.fields) + 2 + j}", "type": "alert", "name": message})
+        elements.append({"ref": self.submit_ref, "type": "button", "name": self.layout['submit_label']})
+        return {"type": "snapshot", "url": self.url, "elements": elements}
+
+
+def scripted_expert_demo(layout, rng, early_submit_prob=0.15, typo_prob=0.1,
+                         optional_fill_prob=0.5):
+    """
+    Run a scripted expert on a layout and record its trajectory.
+
+    The expert fills required fields (and some optional ones) in page order,
+    clicking each textbox before typing, and reacts to fields revealed along
+    the way. To cover validation states it occasionally submits too early or
+    types a value that fails the field's format rule, then fixes the fields
+    named by the validation messages and resubmits.
+    """
+    form = MockForm(layout)
+    task = {
+        "url": layout['url'],
+        "fields": [f['label'] for f in layout['fields']],
+        "submit_selector": layout['submit_label'],
+        "success_condition": layout['success_message'],
+        "max_steps": 50,
+    }
+    observations = [form.snapshot()]
+    actions, rewards, dones = [], [], []
+
+    def act(action):
+        success = form.apply(action)
+        actions.append(action)
+        observations.append(form.snapshot())
+        rewards.append(1.0 if success else 0.0)
+        dones.append(success)
+
+    def submit():
+        act({"type": "submit", "element_ref": form.submit_ref,
+             "description": f"{layout['submit_label']} button", "text": ""})
+
+    def fill(i, allow_typo):
+        field = form.fields[i]
+        ref = MockForm.ref(i)
+        description = f"{field['label']} {field['type']}"
+        if field['type'] == 'checkbox':
+            act({"type": "click", "element_ref": ref, "description": description, "text": ""})
+            return
+        if field['type'] == 'combobox':
+            text = rng.choice(field['options'])
+        else:
+            act({"type": "click", "element_ref": ref, "description": description, "text": ""})
+            if allow_typo and field['kind'] in INVALID_VALUES and rng.random() < typo_prob:
+                text = rng.choice(INVALID_VALUES[field['kind']])
+            else:
+                text = rng.choice(VALUES[field['kind']])
+        act({"type": "type", "element_ref": ref, "description": description, "text": text})
+
+    early_submit_at = rng.randrange(len(form.fields)) if rng.random() < early_submit_prob else None
+    for i in range(len(form.fields)):
+        if i == early_submit_at and form.missing_required():
+            submit()
+        wants = form.fields[i]['required'] or rng.random() < optional_fill_prob
+        if form.visible(i) and not form.filled(i) and wants:
+            fill(i, allow_typo=True)
+    submit()
+    if not form.submitted:
+        for i in sorted(set(form.missing_required() + form.invalid())):
+            fill(i, allow_typo=False)
+        submit()
+    return {
+        "task": task,
+        "observations": observations,
+        "actions": actions,
+        "rewards": rewards,
+        "dones": dones,
+    }
+
+
+def shard_rng(seed, shard_index):
+    """Deterministic per-shard RNG, independent of how shards map to workers."""
+    return random.Random(f"{seed}:{shard_index}")
+
+
+def generate_shard(output_dir, seed, shard_index, num_demos, options):
+    """Generate one gzip JSONL shard; returns its manifest entry."""
+    rng = shard_rng(seed, shard_index)
+    name = f"shard-{shard_index:05d}.jsonl.gz"
+    path = os.path.join(output_dir, name)
+    tmp_path = f"{path}.tmp"
+    num_steps = 0
+    with open(tmp_path, 'wb') as raw:
+        # mtime=0 and no filename keep shards byte-identical across runs
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0,
+                           compresslevel=options.get('compresslevel', 6)) as f:
+            for _ in range(num_demos):
+                layout = random_form_layout(rng, options.get('min_fields', 1),
+                                            options.get('max_fields', 6),
+                                            options.get('dynamic_prob', 0.3))
+                demo = scripted_expert_demo(layout, rng, options.get('early_submit_prob', 0.15),
+                                            options.get('typo_prob', 0.1))
+                num_steps += len(demo['actions'])
+                f.write(json.dumps(demo, separators=(',', ':')).encode('utf-8'))
+                f.write(b'\n')
+    os.replace(tmp_path, path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {
+        'file': name,
+        'num_demos': num_demos,
+        'num_steps': num_steps,
+        'bytes': os.path.getsize(path),
+        'sha256': digest.hexdigest(),
+    }
+
+
+def _generate_shard_args(args):
+    return generate_shard(*args)
+
+
+def generate_dataset(output_dir, num_demos, shard_size=10000, seed=0, workers=None, **options):
+    """
+    Generate a sharded procedural demo dataset and write its manifest.
+
+    Returns:
+        manifest dict (also written to ``output_dir/manifest.json``)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    num_shards = (num_demos + shard_size - 1) // shard_size
+    jobs = [(output_dir, seed, i, min(shard_size, num_demos - i * shard_size), options)
+            for i in range(num_shards)]
+    start = time.time()
+    if workers == 1:
+        shards = [_generate_shard_args(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            shards = list(pool.map(_generate_shard_args, jobs))
+    manifest = {
+        'generator_version': GENERATOR_VERSION,
+        'seed': seed,
+        'num_demos': num_demos,
+        'num_steps': sum(s['num_steps'] for s in shards),
+        'shard_size': shard_size,
+        'options': options,
+        'shards': shards,
+    }
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    with open(f"{manifest_path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    print(f"Generated {num_demos} demos ({manifest['num_steps']} steps) in {num_shards} shards "
+          f"in {time.time() - start:.1f}s -> {output_dir}")
+    return manifest
+
+
+def generate_legacy_demos(demo_dir):
+    """Write the original three single-field demos as indented JSON."""
+    demo_dir = Path(demo_dir)
     demo_dir.mkdir(parents=True, exist_ok=True)
-    
-    demos = [
-        {
-            "task": {
-                "url": "https://example.com/form",
-                "field_selector": "#name-input",
-                "submit_selector": "#submit-btn",
-                "success_condition": "Thank you",
-                "max_steps": 50
-            },
-            "actions": [
-                ("click", "e1", "Name input field", ""),
-                ("type", "e1", "Name input field", "John Doe"),
-                ("submit", "e2", "Submit button", "")
-            ]
-        },
-        {
-            "task": {
-                "url": "https://example.com/form",
-                "field_selector": "#email-input",
-                "submit_selector": "#submit-btn",
-                "success_condition": "Thank you",
-                "max_steps": 50
-            },
-            "actions": [
-                ("click", "e1", "Email input field", ""),
-                ("type", "e1", "Email input field", "user@example.com"),
-                ("submit", "e2", "Submit button", "")
-            ]
-        },
-        {
-            "task": {
-                "url": "https://example.com/form",
-                "field_selector": "#message-input",
-                "submit_selector": "#submit-btn",
-                "success_condition": "Thank you",
-                "max_steps": 50
-            },
-            "actions": [
-                ("click", "e1", "Message input field", ""),
-                ("type", "e1", "Message input field", "Hello world"),
-                ("submit", "e2", "Submit button", "")
-            ]
+
+    fields = [("#name-input", "Name input field", "John Doe"),
+              ("#email-input", "Email input field", "user@example.com"),
+              ("#message-input", "Message input field", "Hello world")]
+    for i, (selector, description, text) in enumerate(fields, 1):
+        task = {
+            "url": "https://example.com/form",
+            "field_selector": selector,
+            "submit_selector": "#submit-btn",
+            "success_condition": "Thank you",
+            "max_steps": 50
         }
-    ]
-    
-    for i, demo_data in enumerate(demos, 1):
-        demo = generate_mock_demo(demo_data["task"], demo_data["actions"])
+        actions = [
+            ("click", "e1", description, ""),
+            ("type", "e1", description, text),
+            ("submit", "e2", "Submit button", "")
+        ]
+        demo = generate_mock_demo(task, actions)
         output_path = demo_dir / f"demo_{i:03d}.json"
         with open(output_path, 'w') as f:
             json.dump(demo, f, indent=2)
         print(f"Generated {output_path}")
 
 
+def main():
+    """Generate procedural (default) or legacy mock demonstrations."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='data/demos/generated')
+    parser.add_argument('--num-demos', type=int, default=10000)
+    parser.add_argument('--shard-size', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='process pool size (default: CPU count)')
+    parser.add_argument('--min-fields', type=int, default=1)
+    parser.add_argument('--max-fields', type=int, default=6)
+    parser.add_argument('--dynamic-prob', type=float, default=0.3)
+    parser.add_argument('--early-submit-prob', type=float, default=0.15)
+    parser.add_argument('--typo-prob', type=float, default=0.1)
+    parser.add_argument('--legacy', action='store_true',
+                        help='write the three hand-written demos to data/demos instead')
+    args = parser.parse_args()
+
+    if args.legacy:
+        generate_legacy_demos("data/demos")
+        return
+    generate_dataset(args.output, args.num_demos, shard_size=args.shard_size, seed=args.seed,
+                     workers=args.workers, min_fields=args.min_fields, max_fields=args.max_fields,
+                     dynamic_prob=args.dynamic_prob, early_submit_prob=args.early_submit_prob,
+                     typo_prob=args.typo_prob)
+
+
 if __name__ == '__main__':
     main()
-
@@ -1,31 +1,166 @@
-"""Script to run PPO training."""
+"""Script to run PPO training.
 
+Episodes are collected concurrently on a pool of MCP sessions, or with
+``--workers N`` on remote rollout workers (scripts/run_rollout_worker.py)
+through a RolloutCoordinator configured by the ``rollout`` section. The
+policy is updated each time the rollout buffer fills. Every
+``checkpoint_interval`` updates a checkpoint is written to ``checkpoint_dir``,
+keeping the last ``keep_checkpoints``. ``--resume`` continues from the latest
+one, including the episode count and task rotation.
+"""
+
+import argparse
+import asyncio
+import logging
 import sys
 sys.path.append('..')
 
-from env.browser_env import BrowserEnv
+import yaml
+
+from env.featurizer import SnapshotFeaturizer
 from models.policy import PolicyNetwork
 from training.ppo_trainer import PPOTrainer
+from training.rollout import run_episode
 from training.rollout_buffer import RolloutBuffer
-import yaml
+from training.rollout_coordinator import RolloutCoordinator
+from training.rollout_worker import pooled_env_factory
+from utils.checkpoint import CheckpointManager
+from utils.logging import log_metrics, set_log_level
+from utils.mcp_client import MCPClient
+from utils.mcp_pool import MCPClientPool
+from utils.serialization import load_tasks
+
+logger = logging.getLogger('playwright_rl')
+
+# Consecutive collection rounds without a single episode before giving up
+MAX_EMPTY_ROUNDS = 10
+
+
+async def collect_local(env_factory, tasks, featurizer, policy):
+    """Run one episode per task concurrently; failed episodes are logged and skipped."""
+    async def episode(task):
+        async with env_factory(task) as env:
+            trajectory, _ = await run_episode(env, featurizer, policy.act)
+            return trajectory
+    results = await asyncio.gather(*(episode(task) for task in tasks), return_exceptions=True)
+    trajectories = []
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("Episode failed: %r", result)
+        else:
+            trajectories.append(result)
+    return trajectories
+
+
+async def collect_remote(coordinator, tasks, policy, episodes_per_task, timeout=None):
+    """Push current weights and run ``episodes_per_task`` episodes per task on the workers."""
+    await coordinator.push_weights(policy.state_dict())
+    try:
+        return await coordinator.collect(tasks, episodes_per_task, timeout)
+    except (RuntimeError, asyncio.TimeoutError) as e:
+        logger.warning("Collection round failed: %r", e)
+        return []
+
+
+def update(trainer, buffer, config, manager, progress):
+    """Train on the buffer, then checkpoint every ``checkpoint_interval`` updates."""
+    batch = buffer.get_batch(float(config.get('gamma', 0.99)),
+                             float(config.get('gae_lambda', 0.95)))
+    buffer.clear()
+    metrics = trainer.train(batch)
+    log_metrics(trainer.global_step, dict(metrics, episodes=progress['episodes']))
+    if trainer.global_step % int(config.get('checkpoint_interval', 10)) == 0:
+        trainer.save_checkpoint(manager, buffer, extra_state=dict(progress))
+
+
+async def train(args):
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    with open(args.mcp_config) as f:
+        mcp_config = yaml.safe_load(f)
+    set_log_level(mcp_config.get('log_level', 'INFO'))
+    tasks = load_tasks(config.get('task_path', 'data/tasks/'))
+    featurizer = SnapshotFeaturizer(obs_dim=args.obs_dim, max_elements=args.max_elements)
+    policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim, hidden_dim=featurizer.obs_dim)
+    trainer = PPOTrainer(policy, config)
+    buffer = RolloutBuffer(int(config.get('buffer_size', 2048)))
+    manager = CheckpointManager(config.get('checkpoint_dir', 'checkpoints/ppo'),
+                                keep_last=int(config.get('keep_checkpoints', 3)))
+    progress = {'episodes': 0, 'next_task': 0}
+    if args.resume and manager.latest() is not None:
+        progress.update(trainer.load_checkpoint(manager, buffer))
+        logger.info("Resumed at update %d, %d episodes", trainer.global_step, progress['episodes'])
+
+    num_episodes = int(config.get('num_episodes', 1000))
+    pool = coordinator = None
+    if args.workers:
+        rollout = config.get('rollout', {})
+        coordinator = RolloutCoordinator(rollout.get('host', '0.0.0.0'),
+                                         int(rollout.get('port', 7531)),
+                                         float(rollout.get('heartbeat_timeout', 10.0)))
+        await coordinator.start()
+        logger.info("Waiting for %d rollout workers", args.workers)
+        await coordinator.wait_for_workers(args.workers)
+        episodes_per_task = int(rollout.get('episodes_per_task', 8))
+        round_size = len(tasks)
+
+        def collect(batch_tasks):
+            return collect_remote(coordinator, batch_tasks, policy, episodes_per_task,
+                                  rollout.get('collect_timeout'))
+    else:
+        pool = await MCPClientPool.create(args.mcp_url, args.num_sessions,
+                                          **MCPClient.config_kwargs(mcp_config))
+        env_factory = pooled_env_factory(pool)
+        round_size = args.num_sessions
+
+        def collect(batch_tasks):
+            return collect_local(env_factory, batch_tasks, featurizer, policy)
+
+    empty_rounds = 0
+    try:
+        while progress['episodes'] < num_episodes:
+            batch_tasks = [tasks[(progress['next_task'] + i) % len(tasks)]
+                           for i in range(round_size)]
+            progress['next_task'] = (progress['next_task'] + round_size) % len(tasks)
+            trajectories = await collect(batch_tasks)
+            for trajectory in trajectories:
+                buffer.add_trajectory(trajectory)
+            # Only finished episodes count towards num_episodes
+            progress['episodes'] += len(trajectories)
+            empty_rounds = 0 if trajectories else empty_rounds + 1
+            if empty_rounds >= MAX_EMPTY_ROUNDS:
+                raise RuntimeError(f"No episodes collected in {empty_rounds} consecutive rounds")
+            if buffer.is_full():
+                update(trainer, buffer, config, manager, progress)
+        if len(buffer):
+            update(trainer, buffer, config, manager, progress)
+        trainer.save_checkpoint(manager, buffer, extra_state=dict(progress))
+    finally:
+        manager.wait()
+        if coordinator is not None:
+            await coordinator.stop()
+        if pool is not None:
+            await pool.close()
+
 
 def main():
-    # Placeholder: load config, env, policy, trainer, buffer
-    # config = load_config('configs/default_ppo.yaml')
-    # env = BrowserEnv(config.task)
-    # policy = PolicyNetwork(...)
-    # trainer = PPOTrainer(policy, config)
-    # buffer = RolloutBuffer(config.buffer_size)
-    # 
-    # for episode in range(config.num_episodes):
-    #     obs = env.reset()
-    #     while not done:
-    #         action = policy.sample(obs)
-    #         next_obs, reward, done, _ = env.step(action)
-    #         buffer.add(...)
-    #     trainer.train(buffer.get_batch())
-    pass
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='configs/default_ppo.yaml')
+    parser.add_argument('--mcp-url', default='http://localhost:8931/mcp')
+    parser.add_argument('--mcp-config', default='configs/mcp_config.yaml')
+    parser.add_argument('--num-sessions', type=int, default=4,
+                        help='MCP sessions, i.e. episodes collected at once')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='collect on this many remote rollout workers instead of local '
+                             'MCP sessions (listens on rollout.host:rollout.port)')
+    parser.add_argument('--obs-dim', type=int, default=256)
+    parser.add_argument('--max-elements', type=int, default=16)
+    parser.add_argument('--resume', action='store_true',
+                        help='continue from the latest checkpoint in checkpoint_dir')
+    args = parser.parse_args()
+    asyncio.run(train(args))
+
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,61 @@
+"""Run a rollout worker daemon that serves episodes to a remote PPO learner."""
+
+import argparse
+import asyncio
+import sys
+sys.path.append('..')
+
+import yaml
+
+from env.featurizer import SnapshotFeaturizer
+from models.policy import PolicyNetwork
+from training.rollout_worker import RolloutWorker, pooled_env_factory
+from utils.logging import export_mcp_metrics_periodically, log_mcp_metrics, set_log_level
+from utils.mcp_client import MCPClient
+from utils.mcp_pool import MCPClientPool
+from utils.metrics import MCPMetrics
+
+
+async def serve(args):
+    with open(args.mcp_config) as f:
+        mcp_config = yaml.safe_load(f)
+    set_log_level(mcp_config.get('log_level', 'INFO'))
+    metrics_config = mcp_config.get('metrics', {})
+    mcp_metrics = MCPMetrics(int(metrics_config.get('ring_size', 4096)))
+    export_paths = (metrics_config.get('jsonl_path'), metrics_config.get('prometheus_path'))
+    featurizer = SnapshotFeaturizer(obs_dim=args.obs_dim, max_elements=args.max_elements)
+    policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim, hidden_dim=featurizer.obs_dim)
+    pool = await MCPClientPool.create(args.mcp_url, args.capacity, metrics=mcp_metrics,
+                                      **MCPClient.config_kwargs(mcp_config))
+    exporter = asyncio.ensure_future(export_mcp_metrics_periodically(
+        mcp_metrics, float(metrics_config.get('export_interval', 60.0)), *export_paths))
+    host, port = args.coordinator.rsplit(':', 1)
+    worker = RolloutWorker(host, int(port), policy, pooled_env_factory(pool),
+                           featurizer=featurizer, capacity=args.capacity,
+                           name=args.name, backend=args.backend)
+    try:
+        await worker.run()
+    finally:
+        exporter.cancel()
+        log_mcp_metrics(mcp_metrics, *export_paths)
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--coordinator', required=True, help='learner host:port')
+    parser.add_argument('--mcp-url', default='http://localhost:8931/mcp')
+    parser.add_argument('--mcp-config', default='configs/mcp_config.yaml')
+    parser.add_argument('--capacity', type=int, default=4,
+                        help='concurrent episodes (one MCP session each)')
+    parser.add_argument('--obs-dim', type=int, default=256)
+    parser.add_argument('--max-elements', type=int, default=16)
+    parser.add_argument('--backend', default='torchscript',
+                        choices=['torchscript', 'compile', 'eager'])
+    parser.add_argument('--name', default=None)
+    args = parser.parse_args()
+    asyncio.run(serve(args))
+
+
+if __name__ == '__main__':
+    main()
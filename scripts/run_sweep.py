@@ -0,0 +1,90 @@
+"""Run a concurrent PPO hyperparameter sweep against one shared MCP session pool."""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+sys.path.append('..')
+
+import yaml
+
+from env.featurizer import SnapshotFeaturizer
+from training.sweep import SweepRunner, expand_search_space
+from utils.logging import export_mcp_metrics_periodically, log_mcp_metrics, set_log_level
+from utils.mcp_client import MCPClient
+from utils.mcp_pool import FairSessionScheduler, MCPClientPool
+from utils.metrics import MCPMetrics
+from utils.serialization import load_tasks
+
+
+async def sweep(args):
+    with open(args.config) as f:
+        sweep_config = yaml.safe_load(f)
+    with open(sweep_config.get('base_config', 'configs/default_ppo.yaml')) as f:
+        base_config = yaml.safe_load(f)
+    with open(args.mcp_config) as f:
+        mcp_config = yaml.safe_load(f)
+    set_log_level(mcp_config.get('log_level', 'INFO'))
+    metrics_config = mcp_config.get('metrics', {})
+    mcp_metrics = MCPMetrics(int(metrics_config.get('ring_size', 4096)))
+    export_paths = (metrics_config.get('jsonl_path'), metrics_config.get('prometheus_path'))
+    halving = sweep_config.get('successive_halving', {})
+    train_tasks = load_tasks(base_config.get('task_path', 'data/tasks/'))
+    eval_tasks = load_tasks(args.eval_tasks) if args.eval_tasks else None
+
+    pool = await MCPClientPool.create(args.mcp_url, int(sweep_config.get('num_sessions', 8)),
+                                      metrics=mcp_metrics, **MCPClient.config_kwargs(mcp_config))
+    exporter = asyncio.ensure_future(export_mcp_metrics_periodically(
+        mcp_metrics, float(metrics_config.get('export_interval', 60.0)), *export_paths))
+    scheduler = FairSessionScheduler(pool)
+    runner = SweepRunner(
+        base_config, sweep_config.get('trials') or expand_search_space(sweep_config['search_space']),
+        scheduler, train_tasks, eval_tasks,
+        featurizer=SnapshotFeaturizer(obs_dim=args.obs_dim, max_elements=args.max_elements),
+        min_env_steps=int(halving.get('min_env_steps', 512)),
+        eta=int(halving.get('eta', 2)),
+        max_rungs=int(halving.get('max_rungs', 4)),
+        eval_episodes=int(sweep_config.get('eval_episodes', 8)),
+        concurrency=int(sweep_config.get('concurrency', 4)),
+        max_wall_clock_s=sweep_config.get('max_wall_clock_s'),
+        seed=int(sweep_config.get('seed', 0)),
+        max_empty_batches=int(sweep_config.get('max_empty_batches', 3)),
+        empty_batch_delay=float(sweep_config.get('empty_batch_delay', 5.0)))
+    try:
+        reports = await runner.run()
+    finally:
+        exporter.cancel()
+        log_mcp_metrics(mcp_metrics, *export_paths)
+        await scheduler.close()
+        await pool.close()
+
+    report_path = args.report or sweep_config.get('report_path', 'sweeps/report.json')
+    os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(reports, f, indent=2)
+    print(f"{'trial':<10} {'status':<17} {'success':>7} {'env steps':>10} {'eval steps':>10} "
+          f"{'share':>6} {'wall s':>8}  overrides")
+    for r in reports:
+        print(f"{r['trial_id']:<10} {r['status']:<17} {r['success_rate']:>7.2f} "
+              f"{r['env_steps']:>10} {r['eval_env_steps']:>10} {r['env_step_share']:>6.1%} "
+              f"{r['wall_clock_s']:>8.1f}  {r['overrides']}")
+    print(f"Report written to {report_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--config', default='configs/sweep_ppo.yaml')
+    parser.add_argument('--mcp-url', default='http://localhost:8931/mcp')
+    parser.add_argument('--mcp-config', default='configs/mcp_config.yaml')
+    parser.add_argument('--eval-tasks', default=None,
+                        help='task file or directory (default: the training tasks)')
+    parser.add_argument('--obs-dim', type=int, default=256)
+    parser.add_argument('--max-elements', type=int, default=16)
+    parser.add_argument('--report', default=None, help='override report_path')
+    args = parser.parse_args()
+    asyncio.run(sweep(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -79,7 +79,8 @@ async def main():
                         input_ref = ref_match.group(1)
                         break
         
-        submit_ref = "e89"
+        if not submit_ref:
+            print("No submit button found in snapshot")
 
         print(f"\nSelected refs - Input: {input_ref}, Submit: {submit_ref}")
         # Execute actions to complete form
@@ -0,0 +1,119 @@
+"""Test multi-node rollout collection with several workers on localhost.
+
+Starts a stub MCP server (benchmarks/stub_mcp.py), a RolloutCoordinator and
+worker processes running scripts/run_rollout_worker.py, which talk to the
+coordinator over TCP only. Checks throughput with one and three workers,
+reassignment when a worker is killed mid-round, that a malformed frame drops
+its worker at once, and that a timed-out round leaves no units behind.
+
+Usage: python test_rollout_distributed.py
+"""
+
+import asyncio
+import os
+import struct
+import subprocess
+import sys
+import time
+
+from benchmarks.stub_mcp import StubMCPServer
+from env.featurizer import SnapshotFeaturizer
+from env.synthetic_pages import snapshot_task
+from models.policy import PolicyNetwork
+from training.rollout_coordinator import RolloutCoordinator
+from utils import wire
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+EPISODES = 24
+
+
+def start_worker(port, mcp_url, name):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'scripts', 'run_rollout_worker.py'),
+         '--coordinator', f'127.0.0.1:{port}', '--mcp-url', mcp_url, '--capacity', '2',
+         '--backend', 'eager', '--name', name],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def timed_round(coordinator, tasks):
+    start = time.perf_counter()
+    trajectories = await coordinator.collect(tasks, EPISODES // len(tasks), timeout=120)
+    elapsed = time.perf_counter() - start
+    steps = sum(len(t['rewards']) for t in trajectories)
+    workers = sorted({t['meta']['worker'] for t in trajectories})
+    print(f"{len(trajectories)} episodes, {steps} steps in {elapsed:.2f}s "
+          f"({steps / elapsed:.1f} steps/s) from {workers}")
+    assert len(trajectories) == EPISODES
+    return steps / elapsed
+
+
+async def send_malformed_frame(port):
+    """Register like a worker, then send metadata that is not valid JSON."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    await wire.write_frame(writer, wire.REGISTER, {'name': 'garbled', 'capacity': 1})
+    await wire.read_frame(reader)
+    meta = b'{not json'
+    payload = struct.pack('!BI', wire.HEARTBEAT, len(meta)) + meta
+    writer.write(struct.pack('!I', len(payload)) + payload)
+    await writer.drain()
+    return writer
+
+
+async def main():
+    featurizer = SnapshotFeaturizer()
+    policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim, hidden_dim=featurizer.obs_dim)
+    tasks = [snapshot_task('small', max_steps=12)]
+    processes = []
+    # Server latency stands in for browser time, which is what workers parallelize
+    with StubMCPServer('small', latency_ms=25) as server:
+        coordinator = RolloutCoordinator('127.0.0.1', 0, heartbeat_timeout=4.0)
+        await coordinator.start()
+        try:
+            print("\n=== 1 WORKER ===")
+            processes.append(start_worker(coordinator.port, server.url, 'node-a'))
+            await coordinator.wait_for_workers(1, timeout=60)
+            await coordinator.push_weights(policy.state_dict())
+            single = await timed_round(coordinator, tasks)
+
+            print("\n=== 3 WORKERS ===")
+            processes += [start_worker(coordinator.port, server.url, f'node-{c}') for c in 'bc']
+            await coordinator.wait_for_workers(3, timeout=60)
+            triple = await timed_round(coordinator, tasks)
+            print(f"Speedup: {triple / single:.2f}x")
+
+            print("\n=== WORKER KILLED MID-ROUND ===")
+            round_task = asyncio.ensure_future(timed_round(coordinator, tasks))
+            await asyncio.sleep(1.0)
+            processes[1].kill()
+            await round_task
+            assert len(coordinator.workers) == 2
+
+            print("\n=== MALFORMED FRAME ===")
+            writer = await send_malformed_frame(coordinator.port)
+            # Well inside the 4s heartbeat timeout
+            await asyncio.sleep(0.5)
+            writer.close()
+            assert len(coordinator.workers) == 2, coordinator.workers
+            print("Garbled worker dropped without waiting for the heartbeat timeout")
+
+            print("\n=== TIMED-OUT ROUND ===")
+            try:
+                await coordinator.collect(tasks, EPISODES, timeout=0.5)
+                raise AssertionError("expected a timeout")
+            except asyncio.TimeoutError:
+                pass
+            assert not coordinator._pending and not coordinator._waiters
+            print("No abandoned units left queued")
+        finally:
+            await coordinator.stop()
+            for process in processes:
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+    print("\n=== Test complete ===")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,5 +1,8 @@
 """Behavior cloning trainer."""
 
+from utils import tracing
+
+
 class BCTrainer:
     """Supervised learning on expert demonstrations."""
     
@@ -7,6 +10,7 @@ class BCTrainer:
         self.policy = policy
         self.config = config
     
+    @tracing.traced('BCTrainer.train', 'train')
     def train(self, demos):
         """Train policy on expert trajectories."""
         # Placeholder: load demos, compute loss, update policy
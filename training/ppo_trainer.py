@@ -1,17 +1,88 @@
 """PPO trainer."""
 
+import torch
+
+from utils import tracing
+
+
 class PPOTrainer:
     """Proximal Policy Optimization trainer."""
     
     def __init__(self, policy, config):
         self.policy = policy
         self.config = config
+        self.optimizer = torch.optim.Adam(policy.parameters(),
+                                          lr=float(config.get('learning_rate', 3e-4)))
+        self.global_step = 0
+    
+    def save_checkpoint(self, manager, rollout_buffer=None, extra_state=None):
+        """Snapshot policy, optimizer, buffer settings and RNG via a CheckpointManager."""
+        return manager.save(self.global_step, self.policy, self.optimizer,
+                            rollout_buffer=rollout_buffer, extra_state=extra_state)
+    
+    def load_checkpoint(self, manager, rollout_buffer=None, path=None):
+        """Resume from the latest (or given) checkpoint; returns its extra_state."""
+        resumed = manager.restore(self.policy, self.optimizer, rollout_buffer, path=path)
+        self.global_step = resumed['step']
+        return resumed['extra_state']
     
+    @tracing.traced('PPOTrainer.train', 'train')
     def train(self, rollouts):
-        """Update policy using PPO algorithm."""
-        # Placeholder: compute advantages, clip objective, update
-        # advantages = compute_gae(rollouts)
-        # loss = ppo_clip_loss(policy, rollouts, advantages)
-        # loss.backward()
-        pass
+        """Update policy using PPO algorithm.
+        
+        Args:
+            rollouts: batch from RolloutBuffer.get_batch() (obs, actions,
+                log_probs, advantages, returns, optional masks)
+        
+        Returns:
+            Mean policy_loss, value_loss, entropy, approx_kl and clip_fraction
+            over all minibatch updates
+        """
+        clip_epsilon = float(self.config.get('clip_epsilon', 0.2))
+        value_coef = float(self.config.get('value_coef', 0.5))
+        entropy_coef = float(self.config.get('entropy_coef', 0.01))
+        max_grad_norm = float(self.config.get('max_grad_norm', 0.5))
+        batch_size = int(self.config.get('batch_size', 64))
+        num_epochs = int(self.config.get('num_epochs', 4))
+        
+        obs = rollouts['obs']
+        masks = rollouts.get('masks')
+        advantages = rollouts['advantages']
+        if len(advantages) > 1:
+            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+        totals = {'policy_loss': 0.0, 'value_loss': 0.0, 'entropy': 0.0,
+                  'approx_kl': 0.0, 'clip_fraction': 0.0}
+        updates = 0
+        self.policy.train()
+        for _ in range(num_epochs):
+            for idx in torch.randperm(len(obs)).split(batch_size):
+                logits, values = self.policy(obs[idx])
+                if masks is not None:
+                    logits = logits.masked_fill(~masks[idx], -1e9)
+                dist = torch.distributions.Categorical(logits=logits)
+                log_probs = dist.log_prob(rollouts['actions'][idx])
+                log_ratio = log_probs - rollouts['log_probs'][idx]
+                ratio = log_ratio.exp()
+                adv = advantages[idx]
+                policy_loss = -torch.min(
+                    ratio * adv,
+                    ratio.clamp(1 - clip_epsilon, 1 + clip_epsilon) * adv).mean()
+                value_loss = 0.5 * (rollouts['returns'][idx] - values.squeeze(-1)).pow(2).mean()
+                entropy = dist.entropy().mean()
+                loss = policy_loss + value_coef * value_loss - entropy_coef * entropy
+                
+                self.optimizer.zero_grad()
+                loss.backward()
+                torch.nn.utils.clip_grad_norm_(self.policy.parameters(), max_grad_norm)
+                self.optimizer.step()
+                
+                with torch.no_grad():
+                    totals['policy_loss'] += policy_loss.item()
+                    totals['value_loss'] += value_loss.item()
+                    totals['entropy'] += entropy.item()
+                    totals['approx_kl'] += ((ratio - 1) - log_ratio).mean().item()
+                    totals['clip_fraction'] += ((ratio - 1).abs() > clip_epsilon).float().mean().item()
+                updates += 1
+        self.global_step += 1
+        return {k: v / max(updates, 1) for k, v in totals.items()}
 
@@ -0,0 +1,56 @@
+"""Single-episode rollout shared by local training, rollout workers and sweeps."""
+
+from typing import Dict, Any, Callable, Tuple
+
+import torch
+
+from env.featurizer import SnapshotFeaturizer
+
+
+async def run_episode(env, featurizer: SnapshotFeaturizer, act: Callable,
+                      deterministic: bool = False) -> Tuple[Dict[str, torch.Tensor], Dict[str, Any]]:
+    """Roll out one episode of ``env`` with a policy.
+
+    Args:
+        env: BrowserEnv-like object with async reset() and step()
+        featurizer: snapshot encoder and action decoder
+        act: ``act(obs, mask=..., deterministic=...)`` returning
+            (action, log_prob, value) batches, e.g. PolicyNetwork.act
+        deterministic: greedy actions (evaluation)
+
+    Returns:
+        (trajectory tensors: obs, masks, actions, log_probs, values, rewards,
+         dones; summary: length, return, success)
+    """
+    obs_list, masks, actions, log_probs, values, rewards, dones = [], [], [], [], [], [], []
+    success = False
+    state = await env.reset()
+    done = False
+    while not done:
+        obs, elements = featurizer.featurize(state)
+        # The snapshot is encoded; drop it before awaiting the next one
+        state = None
+        mask = featurizer.action_mask(elements)
+        action, log_prob, value = act(obs.unsqueeze(0), mask=mask.unsqueeze(0),
+                                      deterministic=deterministic)
+        index = int(action[0])
+        state, reward, done, info = await env.step(featurizer.decode(index, elements))
+        obs_list.append(obs)
+        masks.append(mask)
+        actions.append(index)
+        log_probs.append(float(log_prob[0]))
+        values.append(float(value[0]))
+        rewards.append(float(reward))
+        dones.append(done)
+        success = bool(info.get('success', False))
+    trajectory = {
+        'obs': torch.stack(obs_list),
+        'masks': torch.stack(masks),
+        'actions': torch.tensor(actions, dtype=torch.long),
+        'log_probs': torch.tensor(log_probs),
+        'values': torch.tensor(values),
+        'rewards': torch.tensor(rewards),
+        'dones': torch.tensor(dones, dtype=torch.bool),
+    }
+    summary = {'length': len(rewards), 'return': sum(rewards), 'success': success}
+    return trajectory, summary
@@ -1,33 +1,182 @@
 """Rollout storage buffer."""
 
+from array import array
+
+import torch
+
+
+def compute_gae(rewards, values, dones, gamma=0.99, gae_lambda=0.95, last_value=0.0):
+    """Generalized advantage estimates and returns for a flat run of steps.
+    
+    Steps of consecutive episodes are concatenated; ``dones`` marks episode
+    ends so advantages do not bootstrap across them. ``last_value`` bootstraps
+    a trailing episode that was cut off mid-way.
+    
+    Returns:
+        (advantages, returns) tensors of shape [T]
+    """
+    # The recursion runs over Python floats: indexing tensors element by
+    # element costs ~50x more than the arithmetic itself.
+    rewards = torch.as_tensor(rewards, dtype=torch.float32).tolist()
+    values = torch.as_tensor(values, dtype=torch.float32).tolist()
+    dones = torch.as_tensor(dones, dtype=torch.bool).tolist()
+    advantages = [0.0] * len(rewards)
+    gae = 0.0
+    next_value = float(last_value)
+    for t in reversed(range(len(rewards))):
+        if dones[t]:
+            gae = rewards[t] - values[t]
+        else:
+            gae = rewards[t] + gamma * next_value - values[t] + gamma * gae_lambda * gae
+        advantages[t] = gae
+        next_value = values[t]
+    advantages = torch.tensor(advantages, dtype=torch.float32)
+    return advantages, advantages + torch.tensor(values, dtype=torch.float32)
+
+
+class _TensorColumn:
+    """Per-step tensors stored in one preallocated block instead of N small tensors.
+    
+    Allocated on the first append with room for ``capacity`` rows; doubles if
+    a trajectory runs past capacity.
+    """
+    
+    def __init__(self, capacity):
+        self.capacity = max(int(capacity), 1)
+        self.data = None
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, index):
+        return self.data[:self.size][index]
+    
+    def append(self, value):
+        if self.data is None:
+            self.data = torch.empty((self.capacity,) + tuple(value.shape), dtype=value.dtype)
+        elif self.size == len(self.data):
+            grown = torch.empty((2 * len(self.data),) + tuple(self.data.shape[1:]),
+                                dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+    
+    def stack(self):
+        return self.data[:self.size]
+
+
 class RolloutBuffer:
-    """Stores trajectories for training."""
+    """Stores trajectories for training.
+    
+    Tensor observations and action masks go into preallocated blocks and
+    scalars into typed arrays, so a full buffer costs roughly
+    ``capacity * (obs bytes + mask bytes + 21)`` rather than a Python object
+    per field per step. Non-tensor observations (raw snapshots) are kept in
+    a list.
+    """
     
     def __init__(self, capacity):
         self.capacity = capacity
-        self.observations = []
-        self.actions = []
-        self.rewards = []
-        self.values = []
-        self.log_probs = []
-        self.dones = []
+        self.clear()
     
-    def add(self, obs, action, reward, value, log_prob, done):
+    def __len__(self):
+        return len(self.rewards)
+    
+    def is_full(self):
+        return len(self) >= self.capacity
+    
+    def add(self, obs, action, reward, value, log_prob, done, mask=None):
         """Add transition to buffer."""
-        # Placeholder: append to lists
-        pass
+        self._append_item('observations', obs)
+        self._append_mask(mask)
+        self.actions.append(int(action))
+        self.rewards.append(float(reward))
+        self.values.append(float(value))
+        self.log_probs.append(float(log_prob))
+        self.dones.append(bool(done))
+    
+    def _append_item(self, name, value):
+        column = getattr(self, name)
+        if isinstance(value, torch.Tensor) and isinstance(column, list) and not column:
+            column = _TensorColumn(self.capacity)
+            setattr(self, name, column)
+        elif isinstance(column, _TensorColumn) and not isinstance(value, torch.Tensor):
+            raise ValueError(f"{name}: got {type(value).__name__} after tensor entries")
+        column.append(value)
+    
+    def _append_mask(self, mask):
+        """Store an action mask; steps added without one allow every action."""
+        if mask is None:
+            if isinstance(self.masks, _TensorColumn):
+                mask = torch.ones_like(self.masks.data[0])
+        elif isinstance(self.masks, list) and self.masks:
+            # Earlier steps had no mask: backfill them as unmasked
+            column = _TensorColumn(self.capacity)
+            for _ in self.masks:
+                column.append(torch.ones_like(mask))
+            self.masks = column
+        self._append_item('masks', mask)
+    
+    def add_trajectory(self, trajectory):
+        """Append an episode from ``training.rollout.run_episode`` (or a worker)."""
+        masks = trajectory.get('masks')
+        for t in range(len(trajectory['rewards'])):
+            self.add(trajectory['obs'][t], int(trajectory['actions'][t]),
+                     float(trajectory['rewards'][t]), float(trajectory['values'][t]),
+                     float(trajectory['log_probs'][t]), bool(trajectory['dones'][t]),
+                     masks[t] if masks is not None else None)
+    
+    def state_dict(self):
+        """Return buffer settings for checkpointing.
+        
+        Transitions are not saved: checkpoints are taken between updates,
+        right after the buffer is cleared (see scripts/run_ppo.py).
+        """
+        return {'capacity': self.capacity}
+    
+    def load_state_dict(self, state):
+        """Restore buffer settings from a checkpoint; the buffer restarts empty."""
+        self.capacity = state['capacity']
+        self.clear()
     
     def clear(self):
-        """Clear buffer."""
+        """Clear buffer.
+        
+        Drops the tensor blocks rather than reusing them, so batches returned
+        by get_batch() stay valid after the buffer is refilled.
+        """
         self.observations = []
-        self.actions = []
-        self.rewards = []
-        self.values = []
-        self.log_probs = []
-        self.dones = []
-    
-    def get_batch(self):
-        """Return batched data for training."""
-        # Placeholder: return tensors
-        return None
+        self.masks = []
+        self.actions = array('q')
+        self.rewards = array('f')
+        self.values = array('f')
+        self.log_probs = array('f')
+        self.dones = array('B')
+    
+    def get_batch(self, gamma=0.99, gae_lambda=0.95, last_value=0.0):
+        """Return stacked tensors plus GAE advantages and returns.
+        
+        Keys: obs, actions, log_probs, values, advantages, returns, and masks
+        when any transition was stored with an action mask (transitions
+        without one get an all-True row).
+        """
+        advantages, returns = compute_gae(self.rewards, self.values, self.dones,
+                                          gamma, gae_lambda, last_value)
+        batch = {
+            'obs': self._stack(self.observations),
+            'actions': torch.tensor(self.actions, dtype=torch.long),
+            'log_probs': torch.tensor(self.log_probs, dtype=torch.float32),
+            'values': torch.tensor(self.values, dtype=torch.float32),
+            'advantages': advantages,
+            'returns': returns,
+        }
+        if isinstance(self.masks, _TensorColumn):
+            batch['masks'] = self.masks.stack()
+        return batch
+    
+    @staticmethod
+    def _stack(column):
+        return column.stack() if isinstance(column, _TensorColumn) else torch.stack(column)
 
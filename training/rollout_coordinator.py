@@ -0,0 +1,243 @@
+"""Learner-side coordinator for multi-node rollout collection.
+
+Rollout workers (``training/rollout_worker.py``) connect over TCP and
+register. The learner pushes weights and asks for episodes. The coordinator
+hands episodes out as work units to workers with free slots, pulls back
+trajectories, and re-queues a worker's in-flight units if it stops sending
+heartbeats or its connection drops.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from utils import wire
+
+logger = logging.getLogger(__name__)
+
+
+class _WorkerHandle:
+    """Coordinator-side state for one connected worker."""
+
+    def __init__(self, worker_id: int, name: str, capacity: int, writer: asyncio.StreamWriter):
+        self.worker_id = worker_id
+        self.name = name
+        self.capacity = capacity
+        self.writer = writer
+        self.inflight: Dict[int, Dict[str, Any]] = {}
+        self.last_seen = time.monotonic()
+        self.weight_version = None
+
+    @property
+    def free_slots(self) -> int:
+        return self.capacity - len(self.inflight)
+
+
+class RolloutCoordinator:
+    """Distributes episodes to remote rollout workers and gathers trajectories."""
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 0,
+                 heartbeat_timeout: float = 10.0, max_unit_attempts: int = 3):
+        """
+        Args:
+            host: interface to listen on
+            port: TCP port (0 picks a free one; see ``self.port``)
+            heartbeat_timeout: seconds of silence before a worker is dropped
+            max_unit_attempts: times a unit is retried after worker errors
+        """
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_unit_attempts = max_unit_attempts
+        self.workers: Dict[int, _WorkerHandle] = {}
+        self.weight_version = 0
+        self._weights_blob: Optional[bytes] = None
+        self._pending: deque = deque()
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._unit_ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._worker_joined = asyncio.Event()
+        self._connections = set()
+
+    async def start(self):
+        """Start listening for workers."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._monitor_task = asyncio.ensure_future(self._monitor())
+        logger.info("Rollout coordinator listening on %s:%d", self.host, self.port)
+
+    async def stop(self):
+        """Tell workers to shut down and stop listening."""
+        for handle in list(self.workers.values()):
+            try:
+                await wire.write_frame(handle.writer, wire.SHUTDOWN, {})
+            except ConnectionError:
+                pass
+            handle.writer.close()
+        self.workers.clear()
+        # Closed writers end each connection handler's read loop
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for future in self._waiters.values():
+            if not future.done():
+                future.cancel()
+
+    async def wait_for_workers(self, count: int, timeout: Optional[float] = None):
+        """Block until at least ``count`` workers are registered."""
+        async def _wait():
+            while len(self.workers) < count:
+                self._worker_joined.clear()
+                await self._worker_joined.wait()
+        await asyncio.wait_for(_wait(), timeout)
+
+    async def push_weights(self, state_dict) -> int:
+        """Broadcast new policy weights; returns the new weight version."""
+        self.weight_version += 1
+        self._weights_blob = wire.encode_tensors(state_dict)
+        await asyncio.gather(*(self._send_weights(h) for h in list(self.workers.values())))
+        return self.weight_version
+
+    async def collect(self, tasks: List[Dict[str, Any]], episodes_per_task: int = 1,
+                      timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Run episodes on the workers and return their trajectories.
+
+        Each trajectory is a dict of tensors (obs, actions, log_probs, values,
+        rewards, dones) plus 'meta' (task index, return, success, worker, ...).
+        """
+        futures = []
+        unit_ids = set()
+        for task_index, task in enumerate(tasks):
+            for _ in range(episodes_per_task):
+                unit_id = next(self._unit_ids)
+                future = asyncio.get_running_loop().create_future()
+                self._waiters[unit_id] = future
+                self._pending.append({'unit_id': unit_id, 'task_index': task_index,
+                                      'task': task, 'attempts': 0})
+                unit_ids.add(unit_id)
+                futures.append(future)
+        try:
+            await self._dispatch()
+            return list(await asyncio.wait_for(asyncio.gather(*futures), timeout))
+        finally:
+            # On failure or timeout, stop the rest of this call's units from
+            # being dispatched in later rounds. Units already running on a
+            # worker finish there and their results are discarded.
+            for unit_id in unit_ids:
+                future = self._waiters.pop(unit_id, None)
+                if future is not None and not future.done():
+                    future.cancel()
+            self._pending = deque(u for u in self._pending if u['unit_id'] not in unit_ids)
+
+    async def _send_weights(self, handle: _WorkerHandle):
+        if self._weights_blob is None or handle.weight_version == self.weight_version:
+            return
+        try:
+            await wire.write_frame(handle.writer, wire.WEIGHTS,
+                                   {'version': self.weight_version}, self._weights_blob)
+            handle.weight_version = self.weight_version
+        except ConnectionError:
+            self._drop_worker(handle, "connection lost while sending weights")
+
+    async def _dispatch(self):
+        """Assign pending units to workers with free slots, least-loaded first."""
+        while self._pending:
+            available = [h for h in self.workers.values() if h.free_slots > 0]
+            if not available:
+                return
+            handle = max(available, key=lambda h: h.free_slots)
+            unit = self._pending.popleft()
+            unit['attempts'] += 1
+            handle.inflight[unit['unit_id']] = unit
+            try:
+                await wire.write_frame(handle.writer, wire.TASK, {
+                    'unit_id': unit['unit_id'], 'task': unit['task'],
+                    'weight_version': self.weight_version})
+            except ConnectionError:
+                self._drop_worker(handle, "connection lost while assigning work")
+
+    def _drop_worker(self, handle: _WorkerHandle, reason: str):
+        if self.workers.pop(handle.worker_id, None) is None:
+            return
+        # Units whose collect() call has already returned are not re-queued
+        units = [u for u in handle.inflight.values() if u['unit_id'] in self._waiters]
+        logger.warning("Dropping worker %s (%s); re-queueing %d units",
+                       handle.name, reason, len(units))
+        for unit in units:
+            self._pending.appendleft(unit)
+        handle.inflight.clear()
+        handle.writer.close()
+        asyncio.ensure_future(self._dispatch())
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_timeout / 2)
+            now = time.monotonic()
+            for handle in list(self.workers.values()):
+                if now - handle.last_seen > self.heartbeat_timeout:
+                    self._drop_worker(handle, "heartbeat timeout")
+
+    def _complete(self, handle: _WorkerHandle, meta: Dict[str, Any], blob: bytes):
+        unit = handle.inflight.pop(meta['unit_id'], None)
+        future = self._waiters.get(meta['unit_id'])
+        if unit is None or future is None:
+            # Unknown, or abandoned by a collect() that already returned
+            return
+        if meta.get('error'):
+            logger.warning("Unit %d failed on %s: %s", unit['unit_id'], handle.name, meta['error'])
+            if unit['attempts'] < self.max_unit_attempts:
+                self._pending.append(unit)
+            elif not future.done():
+                self._waiters.pop(unit['unit_id'])
+                future.set_exception(RuntimeError(f"Unit {unit['unit_id']} failed: {meta['error']}"))
+            return
+        trajectory = wire.decode_tensors(blob)
+        trajectory['meta'] = dict(meta, task_index=unit['task_index'], worker=handle.name)
+        self._waiters.pop(unit['unit_id'], None)
+        if not future.done():
+            future.set_result(trajectory)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            await self._serve_connection(reader, writer)
+        finally:
+            self._connections.discard(task)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            msg_type, meta, _ = await wire.read_frame(reader)
+        except (asyncio.IncompleteReadError, ConnectionError, wire.ProtocolError):
+            writer.close()
+            return
+        if msg_type != wire.REGISTER:
+            writer.close()
+            return
+        handle = _WorkerHandle(next(self._worker_ids), meta.get('name', 'worker'),
+                               int(meta.get('capacity', 1)), writer)
+        handle.name = f"{handle.name}#{handle.worker_id}"
+        self.workers[handle.worker_id] = handle
+        logger.info("Worker %s registered (capacity %d)", handle.name, handle.capacity)
+        try:
+            await wire.write_frame(writer, wire.REGISTERED, {
+                'worker_id': handle.worker_id, 'heartbeat_interval': self.heartbeat_timeout / 4})
+            await self._send_weights(handle)
+            self._worker_joined.set()
+            await self._dispatch()
+            while handle.worker_id in self.workers:
+                msg_type, meta, blob = await wire.read_frame(reader)
+                handle.last_seen = time.monotonic()
+                if msg_type == wire.TRAJECTORY:
+                    self._complete(handle, meta, blob)
+                    await self._dispatch()
+        except (asyncio.IncompleteReadError, ConnectionError, wire.ProtocolError) as e:
+            self._drop_worker(handle, type(e).__name__)
@@ -0,0 +1,133 @@
+"""Rollout worker daemon: runs BrowserEnv episodes for a remote coordinator.
+
+Each node runs one worker holding an inference copy of the policy and a pool
+of MCP sessions. The worker registers with the coordinator, applies weight
+pushes, runs assigned episodes concurrently (up to ``capacity``) and streams
+trajectories back, sending heartbeats in between.
+"""
+
+import asyncio
+import logging
+import socket
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Callable, Optional
+
+import torch
+
+from env.browser_env import BrowserEnv
+from env.featurizer import SnapshotFeaturizer
+from models.inference import InferencePolicy
+from training.rollout import run_episode
+from utils import wire
+
+logger = logging.getLogger(__name__)
+
+
+def pooled_env_factory(pool) -> Callable:
+    """Env factory that binds each episode's BrowserEnv to a pooled MCP session."""
+    @asynccontextmanager
+    async def factory(task_config: Dict[str, Any]):
+        async with pool.session() as client:
+            env = BrowserEnv(task_config, client)
+            try:
+                yield env
+            finally:
+                env.close()
+    return factory
+
+
+class RolloutWorker:
+    """Connects to a RolloutCoordinator and serves episode requests."""
+
+    def __init__(self, host: str, port: int, policy, env_factory: Callable,
+                 featurizer: Optional[SnapshotFeaturizer] = None, capacity: int = 1,
+                 name: Optional[str] = None, backend: str = 'torchscript'):
+        """
+        Args:
+            host, port: coordinator address
+            policy: float PolicyNetwork template (weights arrive from the learner)
+            env_factory: ``async with env_factory(task_config) as env`` yields a
+                BrowserEnv-like object; see pooled_env_factory
+            featurizer: snapshot -> tensor encoder and action decoder
+            capacity: episodes run concurrently on this node
+            name: worker name reported to the coordinator (default: hostname)
+            backend: InferencePolicy backend ('torchscript', 'compile', 'eager')
+        """
+        self.host = host
+        self.port = port
+        self.env_factory = env_factory
+        self.featurizer = featurizer or SnapshotFeaturizer()
+        self.capacity = capacity
+        self.name = name or socket.gethostname()
+        example_obs = torch.zeros(1, self.featurizer.obs_dim)
+        self.policy = InferencePolicy(policy, example_obs, backend=backend)
+        self.episodes_completed = 0
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._slots = asyncio.Semaphore(capacity)
+        self._tasks = set()
+
+    async def run(self):
+        """Serve until the coordinator sends SHUTDOWN or the connection drops."""
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        await wire.write_frame(self._writer, wire.REGISTER,
+                               {'name': self.name, 'capacity': self.capacity})
+        msg_type, meta, _ = await wire.read_frame(reader)
+        if msg_type != wire.REGISTERED:
+            raise wire.ProtocolError(f"Expected REGISTERED, got message type {msg_type}")
+        heartbeat = asyncio.ensure_future(self._heartbeat(meta.get('heartbeat_interval', 2.0)))
+        logger.info("Registered with coordinator as worker %s", meta.get('worker_id'))
+        try:
+            while True:
+                msg_type, meta, blob = await wire.read_frame(reader)
+                if msg_type == wire.WEIGHTS:
+                    self.policy.refresh(wire.decode_tensors(blob), meta['version'])
+                elif msg_type == wire.TASK:
+                    task = asyncio.ensure_future(self._serve_unit(meta))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                elif msg_type == wire.SHUTDOWN:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.warning("Lost connection to coordinator")
+        except wire.ProtocolError as e:
+            logger.warning("Dropping coordinator connection: %s", e)
+        finally:
+            heartbeat.cancel()
+            for task in list(self._tasks):
+                task.cancel()
+            self._writer.close()
+
+    async def _heartbeat(self, interval: float):
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await wire.write_frame(self._writer, wire.HEARTBEAT,
+                                       {'inflight': len(self._tasks)})
+        except ConnectionError as e:
+            # run() sees the same failure on its next read and shuts down
+            logger.debug("Heartbeat stopped: %s", e)
+
+    async def _serve_unit(self, meta: Dict[str, Any]):
+        async with self._slots:
+            # Label with the weights the episode started on; a push that
+            # lands mid-episode must not claim the whole trajectory
+            weight_version = self.policy.version
+            try:
+                trajectory, summary = await self.run_episode(meta['task'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Episode for unit %d failed: %s", meta['unit_id'], e)
+                await wire.write_frame(self._writer, wire.TRAJECTORY,
+                                       {'unit_id': meta['unit_id'], 'error': repr(e)})
+                return
+            summary['unit_id'] = meta['unit_id']
+            summary['weight_version'] = weight_version
+            await wire.write_frame(self._writer, wire.TRAJECTORY, summary,
+                                   wire.encode_tensors(trajectory))
+            self.episodes_completed += 1
+
+    async def run_episode(self, task_config: Dict[str, Any]):
+        """Roll out one episode; returns (tensor dict, summary metadata)."""
+        async with self.env_factory(task_config) as env:
+            return await run_episode(env, self.featurizer, self.policy.act)
@@ -0,0 +1,285 @@
+"""Concurrent PPO hyperparameter sweeps over one shared pool of MCP sessions.
+
+Every trial is a full PPO learner (policy, optimizer, rollout buffer) built
+from the base config plus its overrides. Trials collect episodes at the same
+time through a FairSessionScheduler, so browsers are split evenly between
+them instead of each run owning its own.
+
+Trials are pruned with successive halving. Rung ``r`` trains each surviving
+trial up to ``min_env_steps * eta**r`` env steps in total and then evaluates
+it greedily on the eval tasks. Only the top ``1/eta`` by success rate go on
+to the next rung, so later, larger rungs spend browser time on the most
+promising configs. Survivors also get a scheduler weight of
+``1 + success rate``. Each trial reports its env steps (training and
+evaluation) and its active wall-clock time.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, Any, Callable, List, Optional
+
+import torch
+
+from env.browser_env import BrowserEnv
+from env.featurizer import SnapshotFeaturizer
+from models.policy import PolicyNetwork
+from training.ppo_trainer import PPOTrainer
+from training.rollout import run_episode
+from training.rollout_buffer import RolloutBuffer
+from utils.mcp_pool import FairSessionScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def expand_search_space(search_space: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Grid of override dicts, one per combination of the listed values."""
+    keys = sorted(search_space)
+    return [dict(zip(keys, values))
+            for values in itertools.product(*(search_space[k] for k in keys))]
+
+
+class Trial:
+    """One PPO configuration under evaluation, with its budget accounting."""
+
+    def __init__(self, trial_id: str, overrides: Dict[str, Any], config: Dict[str, Any],
+                 featurizer: SnapshotFeaturizer, seed: int = 0):
+        self.trial_id = trial_id
+        self.overrides = overrides
+        self.config = config
+        # Same initial weights for every trial: only the hyperparameters differ
+        torch.manual_seed(seed)
+        self.policy = PolicyNetwork(featurizer.obs_dim, featurizer.action_dim,
+                                    hidden_dim=featurizer.obs_dim)
+        self.trainer = PPOTrainer(self.policy, config)
+        self.buffer = RolloutBuffer(int(config.get('buffer_size', 2048)))
+        self.status = 'running'
+        self.stopped_at_rung: Optional[int] = None
+        self.env_steps = 0
+        self.eval_env_steps = 0
+        self.episodes = 0
+        self.failed_episodes = 0
+        # Batches in which every episode failed (e.g. an MCP outage)
+        self.empty_batches = 0
+        self.updates = 0
+        self.wall_clock_s = 0.0
+        self.evals: List[Dict[str, Any]] = []
+        self.last_train_metrics: Dict[str, float] = {}
+
+    @property
+    def success_rate(self) -> float:
+        return self.evals[-1]['success_rate'] if self.evals else 0.0
+
+    def score(self):
+        """Ranking key: latest eval success rate, then mean return."""
+        if not self.evals:
+            return (0.0, float('-inf'))
+        return (self.evals[-1]['success_rate'], self.evals[-1]['mean_return'])
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'trial_id': self.trial_id,
+            'overrides': self.overrides,
+            'status': self.status,
+            'stopped_at_rung': self.stopped_at_rung,
+            'success_rate': self.success_rate,
+            'env_steps': self.env_steps,
+            'eval_env_steps': self.eval_env_steps,
+            'episodes': self.episodes,
+            'failed_episodes': self.failed_episodes,
+            'empty_batches': self.empty_batches,
+            'updates': self.updates,
+            'wall_clock_s': round(self.wall_clock_s, 3),
+            'evals': self.evals,
+            'last_train_metrics': self.last_train_metrics,
+        }
+
+
+class SweepRunner:
+    """Trains sweep trials concurrently with successive halving."""
+
+    def __init__(self, base_config: Dict[str, Any], trial_overrides: List[Dict[str, Any]],
+                 scheduler: FairSessionScheduler, train_tasks: List[Dict[str, Any]],
+                 eval_tasks: Optional[List[Dict[str, Any]]] = None,
+                 env_factory: Callable = BrowserEnv,
+                 featurizer: Optional[SnapshotFeaturizer] = None,
+                 min_env_steps: int = 512, eta: int = 2, max_rungs: int = 4,
+                 eval_episodes: int = 8, concurrency: int = 4,
+                 max_wall_clock_s: Optional[float] = None, seed: int = 0,
+                 max_empty_batches: int = 3, empty_batch_delay: float = 5.0):
+        """
+        Args:
+            base_config: PPO config (default_ppo.yaml) shared by all trials
+            trial_overrides: one dict of config overrides per trial
+            scheduler: fair scheduler over the shared MCP session pool
+            train_tasks, eval_tasks: task dicts (eval defaults to train tasks)
+            env_factory: ``env_factory(task_config, mcp_client)`` -> BrowserEnv-like
+            featurizer: snapshot encoder and action decoder
+            min_env_steps: cumulative env-step budget of the first rung
+            eta: budget multiplier per rung; 1/eta of trials survive each rung
+            max_rungs: number of rungs
+            eval_episodes: greedy episodes per evaluation
+            concurrency: episodes a single trial runs at once
+            max_wall_clock_s: per-trial active time limit (None = unlimited)
+            seed: policy initialization seed shared by all trials
+            max_empty_batches: consecutive batches with no finished episode
+                before a trial is marked failed
+            empty_batch_delay: wait before retrying after an empty batch,
+                doubled for each further consecutive one
+        """
+        self.featurizer = featurizer or SnapshotFeaturizer()
+        self.trials = [Trial(f"trial-{i:03d}", overrides, dict(base_config, **overrides),
+                             self.featurizer, seed)
+                       for i, overrides in enumerate(trial_overrides)]
+        self.scheduler = scheduler
+        self.train_tasks = list(train_tasks)
+        self.eval_tasks = list(eval_tasks or train_tasks)
+        self.env_factory = env_factory
+        self.min_env_steps = min_env_steps
+        self.eta = eta
+        self.max_rungs = max_rungs
+        self.eval_episodes = eval_episodes
+        self.concurrency = concurrency
+        self.max_wall_clock_s = max_wall_clock_s
+        self.max_empty_batches = max_empty_batches
+        self.empty_batch_delay = empty_batch_delay
+
+    def rung_budget(self, rung: int) -> int:
+        """Cumulative training env steps a trial has reached by the end of ``rung``."""
+        return self.min_env_steps * self.eta ** rung
+
+    async def run(self) -> List[Dict[str, Any]]:
+        """Run the sweep; returns trial reports, best first."""
+        active = list(self.trials)
+        for trial in active:
+            self.scheduler.register(trial.trial_id)
+        for rung in range(self.max_rungs):
+            budget = self.rung_budget(rung)
+            logger.info("Rung %d: %d trials, %d env steps each", rung, len(active), budget)
+            await asyncio.gather(*(self._run_rung(trial, rung, budget) for trial in active))
+            for trial in active:
+                if trial.status != 'running':
+                    self.scheduler.unregister(trial.trial_id)
+            active = sorted((t for t in active if t.status == 'running'),
+                            key=lambda t: t.score(), reverse=True)
+            if rung == self.max_rungs - 1 or len(active) <= 1:
+                break
+            keep = max(1, len(active) // self.eta)
+            for trial in active[keep:]:
+                trial.status = 'stopped'
+                trial.stopped_at_rung = rung
+                self.scheduler.unregister(trial.trial_id)
+                logger.info("Stopping %s at rung %d (success %.2f)",
+                            trial.trial_id, rung, trial.success_rate)
+            active = active[:keep]
+            for trial in active:
+                self.scheduler.set_weight(trial.trial_id, 1.0 + trial.success_rate)
+        for trial in active:
+            trial.status = 'completed'
+            self.scheduler.unregister(trial.trial_id)
+        return self.report()
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Per-trial reports, best first, with each trial's share of env steps."""
+        total = sum(t.env_steps + t.eval_env_steps for t in self.trials) or 1
+        ranked = sorted(self.trials, key=lambda t: (t.status == 'completed', t.score()),
+                        reverse=True)
+        reports = []
+        for trial in ranked:
+            report = trial.report()
+            report['env_step_share'] = round((trial.env_steps + trial.eval_env_steps) / total, 4)
+            reports.append(report)
+        return reports
+
+    async def _run_rung(self, trial: Trial, rung: int, budget: int):
+        start = time.monotonic()
+        try:
+            await self._train_until(trial, budget)
+            if trial.status == 'running':
+                await self._evaluate(trial, rung)
+        finally:
+            trial.wall_clock_s += time.monotonic() - start
+
+    def _out_of_time(self, trial: Trial, started: float) -> bool:
+        if self.max_wall_clock_s is None:
+            return False
+        return trial.wall_clock_s + time.monotonic() - started >= self.max_wall_clock_s
+
+    async def _train_until(self, trial: Trial, budget: int):
+        started = time.monotonic()
+        task_cycle = itertools.cycle(self.train_tasks)
+        empty = 0
+        while trial.env_steps < budget:
+            if self._out_of_time(trial, started):
+                trial.status = 'budget_exhausted'
+                logger.info("%s hit its wall-clock budget", trial.trial_id)
+                break
+            tasks = [next(task_cycle) for _ in range(self.concurrency)]
+            results = await asyncio.gather(*(self._episode(trial, task) for task in tasks),
+                                           return_exceptions=True)
+            completed = 0
+            for result in results:
+                if isinstance(result, BaseException):
+                    trial.failed_episodes += 1
+                    logger.warning("%s episode failed: %r", trial.trial_id, result)
+                    continue
+                trajectory, summary = result
+                trial.buffer.add_trajectory(trajectory)
+                trial.env_steps += summary['length']
+                trial.episodes += 1
+                completed += 1
+            if not completed:
+                # Usually a transient outage: back off and retry, and only
+                # give up on the trial if it keeps happening
+                trial.empty_batches += 1
+                empty += 1
+                if empty >= self.max_empty_batches:
+                    trial.status = 'failed'
+                    logger.warning("%s failed: %d consecutive batches without an episode",
+                                   trial.trial_id, empty)
+                    break
+                await asyncio.sleep(self.empty_batch_delay * 2 ** (empty - 1))
+                continue
+            empty = 0
+            if trial.buffer.is_full():
+                await self._update(trial)
+        # Train on the remainder so the evaluation sees every step in the budget
+        if len(trial.buffer) >= int(trial.config.get('batch_size', 64)):
+            await self._update(trial)
+        trial.buffer.clear()
+
+    async def _update(self, trial: Trial):
+        batch = trial.buffer.get_batch(float(trial.config.get('gamma', 0.99)),
+                                       float(trial.config.get('gae_lambda', 0.95)))
+        trial.buffer.clear()
+        # Off the event loop so other trials keep stepping their browsers
+        trial.last_train_metrics = await asyncio.to_thread(trial.trainer.train, batch)
+        trial.updates += 1
+
+    async def _evaluate(self, trial: Trial, rung: int):
+        tasks = [self.eval_tasks[i % len(self.eval_tasks)] for i in range(self.eval_episodes)]
+        results = await asyncio.gather(*(self._episode(trial, task, deterministic=True)
+                                         for task in tasks), return_exceptions=True)
+        summaries = [r[1] for r in results if not isinstance(r, BaseException)]
+        trial.eval_env_steps += sum(s['length'] for s in summaries)
+        trial.evals.append({
+            'rung': rung,
+            'env_steps': trial.env_steps,
+            # Failed episodes count as unsuccessful
+            'success_rate': sum(s['success'] for s in summaries) / len(tasks),
+            'mean_return': sum(s['return'] for s in summaries) / max(len(summaries), 1),
+        })
+        logger.info("%s rung %d: success %.2f after %d env steps",
+                    trial.trial_id, rung, trial.evals[-1]['success_rate'], trial.env_steps)
+
+    async def _episode(self, trial: Trial, task: Dict[str, Any], deterministic: bool = False):
+        async with self.scheduler.session(trial.trial_id) as client:
+            env = self.env_factory(task, client)
+            try:
+                trajectory, summary = await run_episode(env, self.featurizer, trial.policy.act,
+                                                        deterministic=deterministic)
+            finally:
+                env.close()
+        self.scheduler.charge(trial.trial_id, summary['length'])
+        return trajectory, summary
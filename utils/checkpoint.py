@@ -0,0 +1,284 @@
+"""Asynchronous, atomic training checkpoints with full-state resume.
+
+A checkpoint is a directory ``step_<N>/`` holding one file per shard:
+
+    policy.pt       policy state_dict
+    optimizer.pt    optimizer state_dict (optional)
+    rng.pt          python / numpy / torch RNG states
+    state.json      step, rollout-buffer settings and free-form extra state
+                    (e.g. episode count and task rotation)
+
+Tensor shards are written with ``torch.save``'s zip layout, so they can be
+opened with ``torch.load(..., mmap=True)``: evaluation and inference map the
+file and only page in what they touch instead of deserializing everything.
+
+``save()`` copies tensors to CPU in memory and returns; the files are written
+by a background thread into a temporary directory that is renamed into place
+once complete, so a crash never leaves a partial checkpoint behind. A
+checkpoint being replaced (same step) is renamed aside first and deleted only
+after the new one is in place; a crash in between is repaired the next time
+a CheckpointManager opens the directory.
+"""
+
+import json
+import os
+import random
+import shutil
+import threading
+from typing import Dict, Any, Optional, List
+
+import torch
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; its RNG state is skipped without it
+    np = None
+
+LATEST_FILE = 'latest'
+POLICY_SHARD = 'policy.pt'
+OPTIMIZER_SHARD = 'optimizer.pt'
+RNG_SHARD = 'rng.pt'
+STATE_FILE = 'state.json'
+
+
+def _clone_to_cpu(obj):
+    """Recursively copy tensors in a (nested) state dict to fresh CPU memory."""
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {k: _clone_to_cpu(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_clone_to_cpu(v) for v in obj)
+    return obj
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_file(path: str, write_fn):
+    with open(path, 'wb') as f:
+        write_fn(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def capture_rng_state() -> Dict[str, Any]:
+    """Return RNG states in a form loadable with ``weights_only=True``."""
+    state = {
+        'python': random.getstate(),
+        'torch': torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    if np is not None:
+        name, keys, pos, has_gauss, cached = np.random.get_state()
+        state['numpy'] = {
+            'name': name,
+            'keys': torch.from_numpy(keys.astype(np.int64)),
+            'pos': int(pos),
+            'has_gauss': int(has_gauss),
+            'cached_gaussian': float(cached),
+        }
+    return state
+
+
+def restore_rng_state(state: Dict[str, Any]):
+    """Inverse of ``capture_rng_state``."""
+    version, internal, gauss = state['python']
+    random.setstate((version, tuple(internal), gauss))
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+    if 'numpy' in state and np is not None:
+        s = state['numpy']
+        np.random.set_state((s['name'], s['keys'].numpy().astype(np.uint32), s['pos'],
+                             s['has_gauss'], s['cached_gaussian']))
+
+
+def load_shard(path: str, mmap: bool = True):
+    """Load a tensor shard, memory-mapping it when possible."""
+    return torch.load(path, map_location='cpu', weights_only=True, mmap=mmap)
+
+
+class CheckpointManager:
+    """Writes training checkpoints in the background and restores them."""
+
+    def __init__(self, directory: str, keep_last: int = 3, async_write: bool = True):
+        """
+        Args:
+            directory: root directory holding ``step_<N>/`` checkpoints
+            keep_last: number of most recent checkpoints to retain (0 keeps all)
+            async_write: write from a background thread; if False, save()
+                blocks until the checkpoint is on disk
+        """
+        self.directory = directory
+        self.keep_last = keep_last
+        self.async_write = async_write
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    def _recover(self):
+        """Finish replacements interrupted between renames (see _write)."""
+        for name in os.listdir(self.directory):
+            if not name.startswith('step_') or '.old-' not in name:
+                continue
+            old_dir = os.path.join(self.directory, name)
+            final_dir = os.path.join(self.directory, name.split('.old-')[0])
+            if os.path.exists(final_dir):
+                shutil.rmtree(old_dir, ignore_errors=True)
+            else:
+                os.rename(old_dir, final_dir)
+
+    def _step_dir(self, step: int) -> str:
+        return os.path.join(self.directory, f"step_{step:08d}")
+
+    def save(self, step: int, policy, optimizer=None, rollout_buffer=None,
+             extra_state: Optional[Dict[str, Any]] = None) -> str:
+        """Snapshot training state and write it out.
+
+        Only the in-memory copy happens on the caller's thread; at most one
+        write is in flight, so a second save() waits for the previous one.
+
+        Args:
+            step: global training step, used as the checkpoint id
+            policy: nn.Module whose state_dict is saved
+            optimizer: torch optimizer (optional)
+            rollout_buffer: object with ``state_dict()`` (optional)
+            extra_state: JSON-serializable dict, e.g. curriculum state
+
+        Returns:
+            final checkpoint directory path
+        """
+        self.wait()
+        shards = {POLICY_SHARD: _clone_to_cpu(policy.state_dict()),
+                  RNG_SHARD: capture_rng_state()}
+        if optimizer is not None:
+            shards[OPTIMIZER_SHARD] = _clone_to_cpu(optimizer.state_dict())
+        state = {
+            'step': step,
+            'rollout_buffer': rollout_buffer.state_dict() if rollout_buffer is not None else None,
+            'extra_state': extra_state or {},
+        }
+        # Fail on non-serializable extra_state here, not in the writer thread
+        state_text = json.dumps(state)
+
+        final_dir = self._step_dir(step)
+        if self.async_write:
+            self._thread = threading.Thread(target=self._write, name=f"checkpoint-{step}",
+                                            args=(final_dir, shards, state_text))
+            self._thread.start()
+        else:
+            self._write(final_dir, shards, state_text)
+            self._raise_pending()
+        return final_dir
+
+    def _write(self, final_dir: str, shards: Dict[str, Any], state_text: str):
+        tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+        try:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for name, obj in shards.items():
+                _write_file(os.path.join(tmp_dir, name), lambda f, obj=obj: torch.save(obj, f))
+            _write_file(os.path.join(tmp_dir, STATE_FILE),
+                        lambda f: f.write(state_text.encode('utf-8')))
+            _fsync_dir(tmp_dir)
+            # Replace an existing checkpoint for this step without a window in
+            # which neither copy is on disk: move it aside, swap, then delete
+            old_dir = None
+            if os.path.exists(final_dir):
+                old_dir = f"{final_dir}.old-{os.getpid()}"
+                shutil.rmtree(old_dir, ignore_errors=True)
+                os.rename(final_dir, old_dir)
+            os.rename(tmp_dir, final_dir)
+            _fsync_dir(self.directory)
+            if old_dir is not None:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+            latest_tmp = os.path.join(self.directory, f".{LATEST_FILE}.tmp-{os.getpid()}")
+            _write_file(latest_tmp, lambda f: f.write(os.path.basename(final_dir).encode('utf-8')))
+            os.replace(latest_tmp, os.path.join(self.directory, LATEST_FILE))
+            _fsync_dir(self.directory)
+            self._prune()
+        except BaseException as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            self._error = e
+
+    def _prune(self):
+        if self.keep_last <= 0:
+            return
+        for path in self.list()[:-self.keep_last]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _raise_pending(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Checkpoint write failed") from error
+
+    def wait(self):
+        """Block until the in-flight write (if any) is finished."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._raise_pending()
+
+    def list(self) -> List[str]:
+        """Return completed checkpoint directories, oldest first."""
+        names = sorted(n for n in os.listdir(self.directory)
+                       if n.startswith('step_') and '.' not in n)
+        return [os.path.join(self.directory, n) for n in names]
+
+    def latest(self) -> Optional[str]:
+        """Return the most recent completed checkpoint directory, if any."""
+        pointer = os.path.join(self.directory, LATEST_FILE)
+        if os.path.exists(pointer):
+            with open(pointer) as f:
+                path = os.path.join(self.directory, f.read().strip())
+            if os.path.isdir(path):
+                return path
+        checkpoints = self.list()
+        return checkpoints[-1] if checkpoints else None
+
+    def load(self, path: Optional[str] = None, mmap: bool = True) -> Dict[str, Any]:
+        """Load a checkpoint (latest by default) into a dict of shards.
+
+        Keys: 'policy', 'optimizer' (or None), 'rng', 'step',
+        'rollout_buffer', 'extra_state'.
+        """
+        path = path or self.latest()
+        if path is None:
+            raise FileNotFoundError(f"No checkpoint in {self.directory}")
+        with open(os.path.join(path, STATE_FILE)) as f:
+            state = json.load(f)
+        optimizer_path = os.path.join(path, OPTIMIZER_SHARD)
+        state['policy'] = load_shard(os.path.join(path, POLICY_SHARD), mmap=mmap)
+        state['optimizer'] = load_shard(optimizer_path, mmap=mmap) if os.path.exists(optimizer_path) else None
+        state['rng'] = load_shard(os.path.join(path, RNG_SHARD), mmap=False)
+        return state
+
+    def restore(self, policy, optimizer=None, rollout_buffer=None,
+                path: Optional[str] = None) -> Dict[str, Any]:
+        """Load a checkpoint into live training objects and restore RNG state.
+
+        Returns:
+            dict with 'step' and 'extra_state' to resume the training loop
+        """
+        state = self.load(path, mmap=True)
+        policy.load_state_dict(state['policy'])
+        if optimizer is not None and state['optimizer'] is not None:
+            optimizer.load_state_dict(state['optimizer'])
+        if rollout_buffer is not None and state['rollout_buffer'] is not None:
+            rollout_buffer.load_state_dict(state['rollout_buffer'])
+        restore_rng_state(state['rng'])
+        return {'step': state['step'], 'extra_state': state['extra_state']}
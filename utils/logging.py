@@ -1,7 +1,58 @@
 """Minimal logging utilities."""
 
+import asyncio
+import logging
+
+logger = logging.getLogger('playwright_rl')
+
+
+def set_log_level(level):
+    """Set the project-wide log level.
+
+    At INFO and above, MCP request/response payloads are never formatted, so
+    per-call logging cost drops to a level check. Use DEBUG to see payloads.
+
+    Args:
+        level: logging level name (e.g. 'DEBUG', 'INFO') or int
+    """
+    if isinstance(level, str):
+        level = getattr(logging, level.upper())
+    logging.basicConfig(format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    for name in ('playwright_rl', 'env', 'utils', 'training', 'models'):
+        logging.getLogger(name).setLevel(level)
+
+
 def log_metrics(step, metrics):
     """Log training metrics."""
-    # Placeholder: print or write to file
-    pass
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    formatted = ' '.join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}"
+                         for k, v in metrics.items())
+    logger.info("step %d %s", step, formatted)
+
+
+def log_mcp_metrics(mcp_metrics, jsonl_path=None, prom_path=None):
+    """Export MCP call metrics and log a one-line latency summary per tool.
+
+    Args:
+        mcp_metrics: utils.metrics.MCPMetrics instance
+        jsonl_path: optional path for the recent-call JSONL dump
+        prom_path: optional path for the Prometheus textfile export
+    """
+    if jsonl_path:
+        mcp_metrics.export_jsonl(jsonl_path)
+    if prom_path:
+        mcp_metrics.export_prometheus(prom_path)
+    if logger.isEnabledFor(logging.INFO):
+        for tool, stats in sorted(mcp_metrics.summary().items()):
+            lat = stats['latency']
+            logger.info("%s calls=%d errors=%d timeouts=%d p50=%.1fms p95=%.1fms p99=%.1fms",
+                        tool, stats['calls'], stats['errors'], stats['timeouts'],
+                        lat['p50_us'] / 1e3, lat['p95_us'] / 1e3, lat['p99_us'] / 1e3)
+
 
+async def export_mcp_metrics_periodically(mcp_metrics, interval, jsonl_path=None, prom_path=None):
+    """Run log_mcp_metrics every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        log_mcp_metrics(mcp_metrics, jsonl_path, prom_path)
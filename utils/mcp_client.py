@@ -1,29 +1,124 @@
 """MCP client using urllib requests."""
 
 import json
+import socket
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.request import Request, urlopen
-from urllib.error import HTTPError
+from urllib.error import HTTPError, URLError
 from typing import Dict, Any, Optional
 
+from utils import tracing
+from utils.metrics import MCPMetrics
+from utils.resilience import CircuitBreaker, CircuitOpenError, MCPTimeoutError, RetryPolicy
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    """Return True if exc represents a socket/read timeout."""
+    if isinstance(exc, (socket.timeout, TimeoutError)):
+        return True
+    return isinstance(exc, URLError) and isinstance(exc.reason, (socket.timeout, TimeoutError))
+
 
 class MCPClient:
     """MCP client wrapper for Playwright browser tools."""
     
-    def __init__(self, url: str, session_id: Optional[str] = None):
+    # Tools without side effects on the page; safe to retry or duplicate
+    IDEMPOTENT_TOOLS = frozenset({'browser_snapshot', 'browser_wait_for'})
+    # Tools for which a slow request may be hedged with a second one
+    HEDGEABLE_TOOLS = frozenset({'browser_snapshot'})
+    
+    def __init__(self, url: str, session_id: Optional[str] = None,
+                 metrics: Optional[MCPMetrics] = None,
+                 timeout: float = 30.0,
+                 tool_timeouts: Optional[Dict[str, float]] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 hedge: bool = False,
+                 hedge_percentile: float = 95.0,
+                 hedge_min_samples: int = 20,
+                 max_inflight: int = 2):
+        """
+        Args:
+            url: MCP server endpoint
+            session_id: existing MCP session to attach to
+            metrics: shared MCPMetrics registry (a private one is created if None)
+            timeout: default per-call deadline in seconds
+            tool_timeouts: per-tool deadline overrides; browser_wait_for
+                additionally gets its requested ``time``
+            retry: retry policy for IDEMPOTENT_TOOLS
+            breaker: circuit breaker for this session
+            hedge: send a second request for HEDGEABLE_TOOLS once the first
+                has been outstanding longer than the observed latency percentile
+            hedge_percentile: latency percentile that triggers a hedge
+            hedge_min_samples: calls to observe before hedging is enabled
+            max_inflight: HTTP requests this session runs at once, each on
+                the session's own worker thread (a hedge needs a second one).
+                Further requests queue; time spent queued counts against
+                their deadline
+        """
         self.url = url
         self.session_id = session_id
         self.initialized = False
+        self.metrics = metrics if metrics is not None else MCPMetrics()
+        self.timeout = timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges_sent = 0
+        self.max_inflight = max_inflight
+        # Private threads: a wedged session cannot starve others
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight,
+                                            thread_name_prefix='mcp-http')
     
     @classmethod
-    async def create(cls, url: str = "http://localhost:8931/mcp"):
+    async def create(cls, url: str = "http://localhost:8931/mcp", **kwargs):
         """Create MCP client connected to Playwright server."""
-        client = cls(url)
+        client = cls(url, **kwargs)
         await client.initialize()
         return client
     
-    async def _post_json(self, payload: Dict[str, Any]) -> tuple:
-        """Post JSON-RPC request and parse SSE response."""
+    @staticmethod
+    def config_kwargs(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate the ``resilience`` section of mcp_config.yaml into kwargs."""
+        section = config.get('resilience', {})
+        kwargs = {}
+        if 'timeout' in section:
+            kwargs['timeout'] = float(section['timeout'])
+        if 'tool_timeouts' in section:
+            kwargs['tool_timeouts'] = {k: float(v) for k, v in section['tool_timeouts'].items()}
+        if 'retry' in section:
+            kwargs['retry'] = RetryPolicy(**section['retry'])
+        if 'circuit_breaker' in section:
+            kwargs['breaker'] = CircuitBreaker(**section['circuit_breaker'])
+        if 'hedge' in section:
+            hedge = section['hedge']
+            kwargs['hedge'] = bool(hedge.get('enabled', False))
+            kwargs['hedge_percentile'] = float(hedge.get('percentile', 95.0))
+            kwargs['hedge_min_samples'] = int(hedge.get('min_samples', 20))
+        return kwargs
+    
+    def _deadline(self, tool_name: str, params: Dict[str, Any]) -> float:
+        """Return the deadline in seconds for one call of tool_name."""
+        deadline = self.tool_timeouts.get(tool_name, self.timeout)
+        if tool_name == 'browser_wait_for':
+            deadline += float(params.get('time') or 0)
+        return deadline
+    
+    def _send(self, req: Request, timeout: float) -> tuple:
+        """Blocking HTTP round trip; runs in a worker thread."""
+        try:
+            resp = urlopen(req, timeout=timeout)
+            return resp.status, resp.read(), dict(resp.headers)
+        except HTTPError as e:
+            return e.code, e.read(), dict(e.headers)
+    
+    async def _request(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> tuple:
+        """Post JSON-RPC request; return (status, message, bytes_sent, bytes_received)."""
         data = json.dumps(payload).encode("utf-8")
         headers = {
             "Content-Type": "application/json",
@@ -33,29 +128,55 @@ class MCPClient:
             headers["Mcp-Session-Id"] = self.session_id
         
         req = Request(self.url, data=data, headers=headers, method="POST")
+        timeout = timeout or self.timeout
         
-        try:
-            resp = urlopen(req)
-            body = resp.read().decode("utf-8")
-            status = resp.status
-            resp_headers = dict(resp.headers)
-        except HTTPError as e:
-            body = e.read().decode("utf-8")
-            status = e.code
-            resp_headers = dict(e.headers)
+        # urlopen's timeout bounds each socket operation; the waits below
+        # bound the whole call, including time queued for a worker thread
+        # (threads held by wedged or abandoned requests), so a server
+        # trickling bytes or a wedged tab cannot hold the caller.
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        sent = loop.create_future()
+        
+        def send():
+            loop.call_soon_threadsafe(lambda: sent.done() or sent.set_result(None))
+            return self._send(req, timeout)
+        
+        with tracing.span('http_post', 'mcp'):
+            response = loop.run_in_executor(self._executor, send)
+            try:
+                done, _ = await asyncio.wait({sent, response}, timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise MCPTimeoutError(f"MCP request queued past its {timeout:.1f}s deadline: "
+                                          f"all {self.max_inflight} session threads busy")
+                remaining = max(timeout - (loop.time() - start), 0.0)
+                status, raw, resp_headers = await asyncio.wait_for(response, remaining)
+            except MCPTimeoutError:
+                raise
+            except (asyncio.TimeoutError, OSError) as e:
+                if _is_timeout(e):
+                    raise MCPTimeoutError(f"MCP request exceeded {timeout:.1f}s deadline") from e
+                raise
+            finally:
+                # Drops the request if it is still queued
+                response.cancel()
+                sent.cancel()
         
         # Parse SSE response
         msg = None
-        for line in body.splitlines():
-            line = line.strip()
-            if line.startswith("data:"):
-                data_str = line[len("data:"):].strip()
-                if data_str:
-                    try:
-                        msg = json.loads(data_str)
-                    except json.JSONDecodeError:
-                        pass
-                    break
+        with tracing.span('parse_sse', 'mcp'):
+            body = raw.decode("utf-8")
+            for line in body.splitlines():
+                line = line.strip()
+                if line.startswith("data:"):
+                    data_str = line[len("data:"):].strip()
+                    if data_str:
+                        try:
+                            msg = json.loads(data_str)
+                        except json.JSONDecodeError:
+                            pass
+                        break
         
         # Extract session ID
         if not self.session_id:
@@ -65,6 +186,11 @@ class MCPClient:
                 or resp_headers.get("MCP-SESSION-ID")
             )
         
+        return status, msg, len(data), len(raw)
+    
+    async def _post_json(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> tuple:
+        """Post JSON-RPC request and parse SSE response."""
+        status, msg, _, _ = await self._request(payload, timeout)
         return status, msg
     
     async def initialize(self):
@@ -91,8 +217,55 @@ class MCPClient:
         })
         self.initialized = True
     
+    async def _timed_call(self, tool_name: str, payload: Dict[str, Any], timeout: float) -> tuple:
+        """Single tool request, recorded in metrics."""
+        start = time.perf_counter()
+        try:
+            status, result, sent, received = await self._request(payload, timeout)
+        except Exception as e:
+            self.metrics.record(tool_name, time.perf_counter() - start,
+                                error=True, timeout=_is_timeout(e))
+            raise
+        failed = status != 200 or not result or "error" in result
+        self.metrics.record(tool_name, time.perf_counter() - start, sent, received, error=failed)
+        return status, result
+    
+    async def _hedged_call(self, tool_name: str, payload: Dict[str, Any], timeout: float) -> tuple:
+        """Issue a backup request if the first outlives the latency percentile."""
+        hedge_after = self.metrics.percentile_s(tool_name, self.hedge_percentile,
+                                                min_count=self.hedge_min_samples)
+        primary = asyncio.ensure_future(self._timed_call(tool_name, payload, timeout))
+        if hedge_after is None or hedge_after >= timeout:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+        
+        self.hedges_sent += 1
+        backup = asyncio.ensure_future(self._timed_call(tool_name, payload, timeout))
+        pending = {primary, backup}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
     async def call_tool(self, tool_name: str, params: Dict[str, Any]) -> Any:
-        """Call MCP tool."""
+        """Call MCP tool.
+        
+        Raises:
+            CircuitOpenError: if this session's breaker is open
+            MCPTimeoutError: if the call (and any retries) exceeded the deadline
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for MCP session {self.session_id}")
         if not self.initialized:
             await self.initialize()
         
@@ -102,7 +275,31 @@ class MCPClient:
             "method": "tools/call",
             "params": {"name": tool_name, "arguments": params},
         }
-        status, result = await self._post_json(payload)
+        timeout = self._deadline(tool_name, params)
+        attempts = self.retry.max_attempts if tool_name in self.IDEMPOTENT_TOOLS else 1
+        hedged = self.hedge and tool_name in self.HEDGEABLE_TOOLS
+        
+        for attempt in range(1, attempts + 1):
+            try:
+                if hedged:
+                    status, result = await self._hedged_call(tool_name, payload, timeout)
+                else:
+                    status, result = await self._timed_call(tool_name, payload, timeout)
+            except (MCPTimeoutError, OSError):
+                self.breaker.record_failure()
+                if attempt == attempts or not self.breaker.allow():
+                    raise
+                await asyncio.sleep(self.retry.delay(attempt))
+                continue
+            if status >= 500:
+                self.breaker.record_failure()
+                if attempt < attempts and self.breaker.allow():
+                    await asyncio.sleep(self.retry.delay(attempt))
+                    continue
+            else:
+                self.breaker.record_success()
+            break
+        
         if status != 200 or not result:
             return None
         
@@ -122,4 +319,4 @@ class MCPClient:
     
     async def close(self):
         """Close client."""
-        pass
\ No newline at end of file
+        self._executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""Pool of MCP sessions shared between environments."""
+
+import asyncio
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List, Optional
+
+from utils.mcp_client import MCPClient
+
+
+class MCPClientPool:
+    """Hands out idle MCP sessions, skipping sessions whose circuit is open.
+
+    A session whose breaker opens stays out of rotation until the breaker's
+    reset timeout lets a half-open probe through, so one wedged browser tab
+    does not keep absorbing rollout work.
+    """
+
+    def __init__(self, clients: List[MCPClient], poll_interval: float = 0.5):
+        self.clients = list(clients)
+        self.poll_interval = poll_interval
+        self._idle = list(self.clients)
+        self._cond = asyncio.Condition()
+
+    @classmethod
+    async def create(cls, url: str, size: int, **client_kwargs):
+        """Open ``size`` independent MCP sessions against ``url``."""
+        clients = await asyncio.gather(*(MCPClient.create(url, **client_kwargs)
+                                         for _ in range(size)))
+        return cls(clients)
+
+    @property
+    def healthy(self) -> List[MCPClient]:
+        """Sessions whose breaker currently allows calls."""
+        return [c for c in self.clients if c.breaker.available]
+
+    def _take_idle(self) -> Optional[MCPClient]:
+        for i, client in enumerate(self._idle):
+            if client.breaker.available:
+                return self._idle.pop(i)
+        return None
+
+    async def acquire(self) -> MCPClient:
+        """Wait for an idle session whose breaker is closed, or half-open with no probe out."""
+        async with self._cond:
+            while True:
+                client = self._take_idle()
+                if client is not None:
+                    return client
+                # Open breakers recover on a timer, not on release(), so poll.
+                try:
+                    await asyncio.wait_for(self._cond.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, client: MCPClient):
+        """Return a session to the pool."""
+        async with self._cond:
+            self._idle.append(client)
+            self._cond.notify()
+
+    @asynccontextmanager
+    async def session(self):
+        """``async with pool.session() as client`` acquire/release helper."""
+        client = await self.acquire()
+        try:
+            yield client
+        finally:
+            await self.release(client)
+
+    async def close(self):
+        await asyncio.gather(*(c.close() for c in self.clients))
+
+
+class FairSessionScheduler:
+    """Weighted fair sharing of an MCPClientPool between competing consumers.
+
+    Consumers (e.g. sweep trials) queue for sessions by key. Whenever a
+    session frees up it goes to the waiting consumer with the fewest sessions
+    in flight relative to its weight, ties broken by env steps charged so far
+    relative to weight. Raising a consumer's weight gives it a larger share
+    of the browsers; unregistering it cancels its queued requests.
+    """
+
+    def __init__(self, pool: MCPClientPool):
+        self.pool = pool
+        self.weights: Dict[Hashable, float] = {}
+        self.usage: Dict[Hashable, float] = defaultdict(float)
+        self.inflight: Dict[Hashable, int] = defaultdict(int)
+        self._waiting: Dict[Hashable, deque] = defaultdict(deque)
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def register(self, consumer: Hashable, weight: float = 1.0):
+        self.weights[consumer] = weight
+
+    def set_weight(self, consumer: Hashable, weight: float):
+        if consumer in self.weights:
+            self.weights[consumer] = weight
+
+    def unregister(self, consumer: Hashable):
+        """Stop serving ``consumer``; its queued acquires raise CancelledError."""
+        self.weights.pop(consumer, None)
+        for future in self._waiting.pop(consumer, ()):
+            future.cancel()
+
+    def charge(self, consumer: Hashable, steps: float):
+        """Record env steps a consumer spent on its sessions."""
+        self.usage[consumer] += steps
+
+    def _pick(self) -> Optional[Hashable]:
+        best, best_key = None, None
+        for consumer, queue in self._waiting.items():
+            while queue and queue[0].done():
+                queue.popleft()
+            if not queue or consumer not in self.weights:
+                continue
+            weight = max(self.weights[consumer], 1e-6)
+            key = (self.inflight[consumer] / weight, self.usage[consumer] / weight)
+            if best_key is None or key < best_key:
+                best, best_key = consumer, key
+        return best
+
+    async def _dispatch(self):
+        while True:
+            if self._pick() is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            client = await self.pool.acquire()
+            # Re-pick: shares may have shifted while waiting for a session
+            consumer = self._pick()
+            if consumer is None:
+                await self.pool.release(client)
+                continue
+            self.inflight[consumer] += 1
+            self._waiting[consumer].popleft().set_result(client)
+
+    async def acquire(self, consumer: Hashable) -> MCPClient:
+        """Wait for this consumer's turn at a healthy session."""
+        if consumer not in self.weights:
+            raise KeyError(f"Unregistered consumer {consumer!r}")
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[consumer].append(future)
+        self._wakeup.set()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Cancelled after being granted a session: hand it back
+            if future.done() and not future.cancelled():
+                asyncio.ensure_future(self.release(consumer, future.result()))
+            raise
+
+    async def release(self, consumer: Hashable, client: MCPClient):
+        self.inflight[consumer] -= 1
+        await self.pool.release(client)
+
+    @asynccontextmanager
+    async def session(self, consumer: Hashable):
+        """``async with scheduler.session(key) as client`` acquire/release helper."""
+        client = await self.acquire(consumer)
+        try:
+            yield client
+        finally:
+            await self.release(consumer, client)
+
+    async def close(self):
+        """Stop dispatching (the pool itself is left open)."""
+        for consumer in list(self._waiting):
+            for future in self._waiting.pop(consumer):
+                future.cancel()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
@@ -0,0 +1,244 @@
+"""Low-overhead per-tool MCP call instrumentation.
+
+Counters and latency histograms are updated in-process on every call; the
+ring buffer of recent calls and the aggregates can be exported to JSONL and
+to the Prometheus text exposition format.
+"""
+
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+# Fixed ``le`` bounds (seconds) for the Prometheus export, so every scrape
+# exposes the same series regardless of which latencies have been seen
+PROMETHEUS_BUCKETS_S = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                        1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _atomic_write(path: str, text: str):
+    """Write text to path via a temp file so readers never see partial output."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram over microsecond latencies.
+
+    Each power of two is split into ``sub_buckets`` linear buckets, so the
+    relative error of any recorded value is bounded by ``1 / sub_buckets``
+    while the bucket count stays logarithmic in the value range.
+    """
+
+    def __init__(self, sub_buckets: int = 8, max_value_us: int = 600_000_000):
+        self.sub_bits = max(0, int(math.log2(sub_buckets)))
+        self.sub_buckets = 1 << self.sub_bits
+        self.max_value_us = max_value_us
+        num_buckets = self._index(max_value_us) + 1
+        self.counts = [0] * num_buckets
+        self.count = 0
+        self.total_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_buckets:
+            return value_us
+        exponent = value_us.bit_length() - 1 - self.sub_bits
+        mantissa = value_us >> exponent
+        return (exponent << self.sub_bits) + mantissa
+
+    def _upper_bound(self, index: int) -> int:
+        """Largest value (inclusive) that maps to ``index``."""
+        if index < self.sub_buckets:
+            return index
+        exponent = (index >> self.sub_bits) - 1
+        mantissa = (index & (self.sub_buckets - 1)) | self.sub_buckets
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value_us: int):
+        """Record a single latency in microseconds."""
+        value_us = min(max(int(value_us), 0), self.max_value_us)
+        self.counts[self._index(value_us)] += 1
+        self.count += 1
+        self.total_us += value_us
+        if self.min_us is None or value_us < self.min_us:
+            self.min_us = value_us
+        if value_us > self.max_us:
+            self.max_us = value_us
+
+    def percentile(self, q: float) -> int:
+        """Return the upper bucket bound containing the q-th percentile (0-100)."""
+        if self.count == 0:
+            return 0
+        target = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self._upper_bound(index), self.max_us)
+        return self.max_us
+
+    def buckets(self) -> Iterable[tuple]:
+        """Yield (upper_bound_us, cumulative_count) for non-empty buckets."""
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count:
+                cumulative += bucket_count
+                yield self._upper_bound(index), cumulative
+
+    def cumulative_counts(self, bounds_us: Sequence[int]) -> List[int]:
+        """Cumulative counts at fixed ascending upper bounds.
+
+        A value is counted at the first bound at or above its bucket's upper
+        bound, so a bucket straddling a bound is reported under the next one.
+        """
+        counts = []
+        cumulative = 0
+        index = 0
+        for bound in bounds_us:
+            while index < len(self.counts) and self._upper_bound(index) <= bound:
+                cumulative += self.counts[index]
+                index += 1
+            counts.append(cumulative)
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """Return count, mean and common percentiles in microseconds."""
+        return {
+            'count': self.count,
+            'mean_us': self.total_us / self.count if self.count else 0.0,
+            'min_us': self.min_us or 0,
+            'p50_us': self.percentile(50),
+            'p95_us': self.percentile(95),
+            'p99_us': self.percentile(99),
+            'max_us': self.max_us,
+        }
+
+
+class ToolStats:
+    """Aggregated counters for a single MCP tool."""
+
+    __slots__ = ('calls', 'errors', 'timeouts', 'bytes_sent', 'bytes_received', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency': self.latency.summary(),
+        }
+
+
+class MCPMetrics:
+    """Per-tool counters, latency histograms and a ring buffer of recent calls.
+
+    A single instance can be shared by several ``MCPClient`` objects to
+    aggregate over a whole rollout worker.
+    """
+
+    def __init__(self, ring_size: int = 4096):
+        self.tools: Dict[str, ToolStats] = {}
+        self.recent = deque(maxlen=ring_size)
+
+    def record(self, tool_name: str, latency_s: float, bytes_sent: int = 0,
+               bytes_received: int = 0, error: bool = False, timeout: bool = False):
+        """Record the outcome of one tool call."""
+        stats = self.tools.get(tool_name)
+        if stats is None:
+            stats = self.tools[tool_name] = ToolStats()
+        latency_us = int(latency_s * 1e6)
+        stats.calls += 1
+        stats.bytes_sent += bytes_sent
+        stats.bytes_received += bytes_received
+        if error:
+            stats.errors += 1
+        if timeout:
+            stats.timeouts += 1
+        stats.latency.record(latency_us)
+        self.recent.append((time.time(), tool_name, latency_us, bytes_sent,
+                            bytes_received, error, timeout))
+
+    def percentile_s(self, tool_name: str, q: float, min_count: int = 1) -> Optional[float]:
+        """Return the q-th latency percentile for a tool in seconds.
+
+        Returns None until at least ``min_count`` calls have been recorded.
+        """
+        stats = self.tools.get(tool_name)
+        if stats is None or stats.latency.count < max(1, min_count):
+            return None
+        return stats.latency.percentile(q) / 1e6
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return aggregated stats keyed by tool name."""
+        return {name: stats.to_dict() for name, stats in self.tools.items()}
+
+    def reset(self):
+        """Drop all recorded data."""
+        self.tools.clear()
+        self.recent.clear()
+
+    def export_jsonl(self, path: str):
+        """Write the ring buffer of recent calls as one JSON object per line."""
+        lines: List[str] = []
+        for ts, tool, latency_us, sent, received, error, timeout in self.recent:
+            lines.append(json.dumps({
+                'ts': ts,
+                'tool': tool,
+                'latency_us': latency_us,
+                'bytes_sent': sent,
+                'bytes_received': received,
+                'error': error,
+                'timeout': timeout,
+            }))
+        _atomic_write(path, '\n'.join(lines) + ('\n' if lines else ''))
+
+    def to_prometheus(self, prefix: str = 'mcp_tool') -> str:
+        """Render aggregates in the Prometheus text exposition format."""
+        out = []
+        counters = [
+            ('calls_total', 'calls', 'Total MCP tool calls.'),
+            ('errors_total', 'errors', 'MCP tool calls that raised or returned an error.'),
+            ('timeouts_total', 'timeouts', 'MCP tool calls that timed out.'),
+            ('bytes_sent_total', 'bytes_sent', 'Request payload bytes sent.'),
+            ('bytes_received_total', 'bytes_received', 'Response payload bytes received.'),
+        ]
+        for suffix, attr, help_text in counters:
+            metric = f"{prefix}_{suffix}"
+            out.append(f"# HELP {metric} {help_text}")
+            out.append(f"# TYPE {metric} counter")
+            for name, stats in sorted(self.tools.items()):
+                out.append(f'{metric}{{tool="{name}"}} {getattr(stats, attr)}')
+
+        bounds_us = [int(b * 1e6) for b in PROMETHEUS_BUCKETS_S]
+        metric = f"{prefix}_latency_seconds"
+        out.append(f"# HELP {metric} MCP tool call latency.")
+        out.append(f"# TYPE {metric} histogram")
+        for name, stats in sorted(self.tools.items()):
+            hist = stats.latency
+            for bound, cumulative in zip(PROMETHEUS_BUCKETS_S, hist.cumulative_counts(bounds_us)):
+                out.append(f'{metric}_bucket{{tool="{name}",le="{bound:g}"}} {cumulative}')
+            out.append(f'{metric}_bucket{{tool="{name}",le="+Inf"}} {hist.count}')
+            out.append(f'{metric}_sum{{tool="{name}"}} {hist.total_us / 1e6:.6f}')
+            out.append(f'{metric}_count{{tool="{name}"}} {hist.count}')
+        return '\n'.join(out) + '\n'
+
+    def export_prometheus(self, path: str, prefix: str = 'mcp_tool'):
+        """Write aggregates to a Prometheus textfile-collector file."""
+        _atomic_write(path, self.to_prometheus(prefix))
@@ -0,0 +1,100 @@
+"""Deadlines, retry policy and circuit breaking for MCP calls."""
+
+import random
+import time
+from typing import Optional
+
+
+class MCPTimeoutError(TimeoutError):
+    """An MCP tool call exceeded its deadline."""
+
+
+class CircuitOpenError(Exception):
+    """The session's circuit breaker is open; the call was not attempted."""
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.05,
+                 max_delay: float = 1.0, rng: Optional[random.Random] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        """Return the sleep before retry number ``attempt`` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self.rng.uniform(0, cap)
+
+
+class CircuitBreaker:
+    """Per-session breaker: closed -> open after consecutive failures.
+
+    While open, calls are rejected without touching the network. After
+    ``reset_timeout`` seconds a single probe call is let through (half-open);
+    its outcome closes or re-opens the breaker. Other callers are rejected
+    while the probe is in flight; a probe that never reports back (e.g. it
+    was cancelled) is given up on after another ``reset_timeout``.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        # monotonic start of the half-open probe in flight, if any
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def _probe_in_flight(self, now: float) -> bool:
+        return self._probe_started is not None and now - self._probe_started < self.reset_timeout
+
+    @property
+    def available(self) -> bool:
+        """True if allow() would let a call through; unlike allow(), claims nothing."""
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN
+                                        and not self._probe_in_flight(time.monotonic()))
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted now.
+
+        In the half-open state this claims the probe: the caller must report
+        the outcome with record_success() or record_failure().
+        """
+        state = self.state
+        if state != self.HALF_OPEN:
+            return state == self.CLOSED
+        now = time.monotonic()
+        if self._probe_in_flight(now):
+            return False
+        self._probe_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._state = self.CLOSED
+        self._probe_started = None
+
+    def record_failure(self):
+        self._probe_started = None
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
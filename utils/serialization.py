@@ -1,22 +1,76 @@
 """Serialization utilities for models and data."""
 
+import gzip
+import json
+import os
+
+import torch
+
+from utils.checkpoint import POLICY_SHARD, load_shard
+
+
 def save_model(model, path):
     """Save model checkpoint."""
-    # Placeholder: torch.save(model.state_dict(), path)
-    pass
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
 
 def load_model(model, path):
-    """Load model checkpoint."""
-    # Placeholder: model.load_state_dict(torch.load(path))
-    pass
+    """Load model checkpoint.
+    
+    ``path`` may be a file written by save_model or a CheckpointManager
+    checkpoint directory. Weights are copied into the model's existing
+    parameters, so optimizers built over them stay valid. (For inference-only
+    loading without the copy, see scripts/evaluate.py's load_policy.)
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, POLICY_SHARD)
+    model.load_state_dict(load_shard(path, mmap=True))
+    return model
+
+def iter_demos(path):
+    """Stream expert demonstrations one at a time.
+    
+    ``path`` may be a single .json demo, a .jsonl/.jsonl.gz shard, or a
+    directory. A directory with a manifest.json (written by
+    scripts/generate_mock_demos.py) is read shard by shard in manifest order;
+    otherwise every demo file in it is read in sorted order.
+    """
+    if os.path.isdir(path):
+        manifest_path = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                files = [shard['file'] for shard in json.load(f)['shards']]
+        else:
+            files = sorted(n for n in os.listdir(path)
+                           if n.endswith(('.json', '.jsonl', '.jsonl.gz')))
+        for name in files:
+            yield from iter_demos(os.path.join(path, name))
+    elif path.endswith('.jsonl.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+    elif path.endswith('.jsonl'):
+        with open(path) as f:
+            for line in f:
+                yield json.loads(line)
+    else:
+        with open(path) as f:
+            yield json.load(f)
 
 def load_demos(path):
     """Load expert demonstrations."""
-    # Placeholder: load from JSON/pickle
-    return []
+    return list(iter_demos(path))
 
 def load_task(path):
     """Load task configuration."""
-    # Placeholder: load from JSON
-    return {}
+    with open(path) as f:
+        return json.load(f)
+
+def load_tasks(path):
+    """Load one task file, or every task in a directory (sorted by filename)."""
+    if os.path.isdir(path):
+        return [load_task(os.path.join(path, name))
+                for name in sorted(os.listdir(path)) if name.endswith('.json')]
+    return [load_task(path)]
 
@@ -0,0 +1,223 @@
+"""Opt-in span tracing with Chrome trace-event (Perfetto) export.
+
+Tracing is off by default and ``span()`` then returns a shared no-op context
+manager, so instrumented hot paths cost one attribute check. When enabled,
+events go into a bounded in-memory ring and ``dump()`` writes them as Chrome
+trace-event JSON, loadable in ui.perfetto.dev or chrome://tracing.
+
+Spans opened with a ``track`` (e.g. one per ``BrowserEnv``) are emitted as
+async begin/end events, and every span nested inside them, including those in
+``MCPClient`` or the policy, inherits the track through a context variable.
+Concurrent environments running as separate asyncio tasks therefore show up as
+separate tracks instead of overlapping on one thread.
+
+Set ``PLAYWRIGHT_RL_TRACE=<path>`` to enable tracing at import time and dump to
+``<path>`` at interpreter exit.
+"""
+
+import atexit
+import contextvars
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+_current_track = contextvars.ContextVar('trace_track', default=None)
+_track_ids = itertools.count(1)
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Active span; emits a complete event, or begin/end events on a track."""
+
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'track', 'token', 'start')
+
+    def __init__(self, tracer, name, cat, args, track):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.track = track
+        self.token = None
+        self.start = 0.0
+
+    def __enter__(self):
+        if self.track is None:
+            self.track = _current_track.get()
+        else:
+            self.token = _current_track.set(self.track)
+        self.start = _now_us()
+        if self.track is not None:
+            self.tracer._emit('b', self.name, self.cat, self.start, self.args, self.track)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        if self.track is not None:
+            args = {'error': exc_type.__name__} if exc_type is not None else None
+            self.tracer._emit('e', self.name, self.cat, end, args, self.track)
+        else:
+            event = self.tracer._event('X', self.name, self.cat, self.start, self.args)
+            event['dur'] = end - self.start
+            if exc_type is not None:
+                event.setdefault('args', {})['error'] = exc_type.__name__
+            self.tracer.events.append(event)
+        if self.token is not None:
+            _current_track.reset(self.token)
+        return False
+
+
+class Tracer:
+    """Bounded in-memory recorder of trace events."""
+
+    def __init__(self, capacity: int = 200_000):
+        self.enabled = False
+        self.events = deque(maxlen=capacity)
+        self.pid = os.getpid()
+
+    def _event(self, ph: str, name: str, cat: str, ts: float,
+               args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        event = {'name': name, 'cat': cat, 'ph': ph, 'ts': ts,
+                 'pid': self.pid, 'tid': threading.get_ident()}
+        if args:
+            event['args'] = dict(args)
+        return event
+
+    def _emit(self, ph, name, cat, ts, args, track):
+        event = self._event(ph, name, cat, ts, args)
+        event['id'] = track
+        self.events.append(event)
+
+    def span(self, name: str, cat: str = 'default', args: Optional[Dict[str, Any]] = None,
+             track: Optional[str] = None):
+        """Return a context manager that records ``name`` for its duration."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args, track)
+
+    def instant(self, name: str, cat: str = 'default', args: Optional[Dict[str, Any]] = None):
+        """Record a zero-duration marker."""
+        if not self.enabled:
+            return
+        event = self._event('i', name, cat, _now_us(), args)
+        event['s'] = 't'
+        self.events.append(event)
+
+    def counter(self, name: str, values: Dict[str, float], cat: str = 'default'):
+        """Record a counter sample (rendered as a line chart)."""
+        if not self.enabled:
+            return
+        self.events.append(self._event('C', name, cat, _now_us(), values))
+
+    def clear(self):
+        """Drop all recorded events."""
+        self.events.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the recorded events in Chrome trace-event JSON form."""
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid,
+                     'args': {'name': f'playwright-rl ({self.pid})'}}]
+        return {'traceEvents': metadata + list(self.events), 'displayTimeUnit': 'ms'}
+
+    def dump(self, path: str):
+        """Write recorded events to ``path`` as Chrome trace-event JSON."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def enable(capacity: Optional[int] = None):
+    """Start recording spans, optionally resizing the event buffer."""
+    if capacity is not None and capacity != _tracer.events.maxlen:
+        _tracer.events = deque(_tracer.events, maxlen=capacity)
+    _tracer.enabled = True
+
+
+def disable():
+    """Stop recording spans; already recorded events are kept."""
+    _tracer.enabled = False
+
+
+def is_enabled() -> bool:
+    return _tracer.enabled
+
+
+def span(name: str, cat: str = 'default', args: Optional[Dict[str, Any]] = None,
+         track: Optional[str] = None):
+    """Context manager recording ``name`` on the process-wide tracer."""
+    if not _tracer.enabled:
+        return _NULL_SPAN
+    return _Span(_tracer, name, cat, args, track)
+
+
+def new_track(prefix: str) -> str:
+    """Return a fresh async track id, e.g. ``env-3``."""
+    return f"{prefix}-{next(_track_ids)}"
+
+
+def dump(path: str):
+    """Write the process-wide tracer's events to ``path``."""
+    _tracer.dump(path)
+
+
+def traced(name: Optional[str] = None, cat: str = 'default'):
+    """Decorator wrapping a function or coroutine function in a span."""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _tracer.enabled:
+                    return await fn(*args, **kwargs)
+                with _Span(_tracer, span_name, cat, None, None):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return fn(*args, **kwargs)
+            with _Span(_tracer, span_name, cat, None, None):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_trace_path = os.environ.get('PLAYWRIGHT_RL_TRACE')
+if _trace_path:
+    enable()
+    atexit.register(dump, _trace_path)
@@ -0,0 +1,94 @@
+"""Length-prefixed binary framing for the rollout worker protocol.
+
+Frame layout (network byte order):
+
+    uint32  payload length (everything after this field)
+    uint8   message type
+    uint32  metadata length
+    bytes   metadata, UTF-8 JSON
+    bytes   blob (remaining bytes; tensors serialized with torch.save)
+
+Control messages carry only metadata; weight pushes and trajectories carry
+their tensors in the blob, so no shared filesystem is needed.
+"""
+
+import asyncio
+import io
+import json
+import struct
+from typing import Dict, Any, Tuple
+
+import torch
+
+REGISTER = 1
+REGISTERED = 2
+HEARTBEAT = 3
+WEIGHTS = 4
+TASK = 5
+TRAJECTORY = 6
+SHUTDOWN = 7
+
+MAX_FRAME_BYTES = 256 * 1024 * 1024
+
+_LENGTH = struct.Struct('!I')
+_HEADER = struct.Struct('!BI')
+
+
+class ProtocolError(Exception):
+    """Malformed or oversized frame."""
+
+
+def encode_frame(msg_type: int, meta: Dict[str, Any], blob: bytes = b'') -> bytes:
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode('utf-8')
+    payload_len = _HEADER.size + len(meta_bytes) + len(blob)
+    if payload_len > MAX_FRAME_BYTES:
+        raise ProtocolError(f"Frame of {payload_len} bytes exceeds {MAX_FRAME_BYTES}")
+    return b''.join((_LENGTH.pack(payload_len), _HEADER.pack(msg_type, len(meta_bytes)),
+                     meta_bytes, blob))
+
+
+async def write_frame(writer: asyncio.StreamWriter, msg_type: int,
+                      meta: Dict[str, Any], blob: bytes = b''):
+    """Send one frame. A single write() keeps concurrent senders from interleaving."""
+    writer.write(encode_frame(msg_type, meta, blob))
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any], bytes]:
+    """Read one frame.
+
+    Raises:
+        asyncio.IncompleteReadError: on EOF
+        ProtocolError: if the frame is oversized or its metadata is not a
+            UTF-8 JSON object
+    """
+    (payload_len,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    if payload_len > MAX_FRAME_BYTES or payload_len < _HEADER.size:
+        raise ProtocolError(f"Invalid frame length {payload_len}")
+    payload = await reader.readexactly(payload_len)
+    msg_type, meta_len = _HEADER.unpack_from(payload)
+    meta_end = _HEADER.size + meta_len
+    if meta_end > payload_len:
+        raise ProtocolError("Metadata length exceeds frame")
+    try:
+        meta = json.loads(payload[_HEADER.size:meta_end].decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Undecodable frame metadata: {e}") from e
+    if not isinstance(meta, dict):
+        raise ProtocolError(f"Frame metadata is {type(meta).__name__}, expected an object")
+    return msg_type, meta, payload[meta_end:]
+
+
+def encode_tensors(tensors: Dict[str, torch.Tensor]) -> bytes:
+    buffer = io.BytesIO()
+    torch.save({k: v.detach().cpu().contiguous() for k, v in tensors.items()}, buffer)
+    return buffer.getvalue()
+
+
+def decode_tensors(blob: bytes) -> Dict[str, torch.Tensor]:
+    """Inverse of encode_tensors; raises ProtocolError on a corrupt blob."""
+    # weights_only: frames come off the network, never unpickle arbitrary objects
+    try:
+        return torch.load(io.BytesIO(blob), map_location='cpu', weights_only=True)
+    except Exception as e:
+        raise ProtocolError(f"Undecodable tensor blob: {e}") from e